@@ -0,0 +1,212 @@
+'''
+Created on Oct 18, 2026
+
+Finds cleanup candidates in the objects and object groups of a firewall:
+group members already covered by another member of the same group, groups
+with identical contents, and objects and groups that nothing uses.
+'''
+
+import sys, hashlib, parse_args, collect, profiler
+
+from array import array
+
+
+def redundant_members(registry, group):
+    '''
+    Finds the members of an object group whose addresses are all covered
+    by other members of the same group, such as a host inside a subnet
+    that is already listed. Every interval of every member is sorted once
+    and swept, keeping track of the interval reaching furthest so far, so
+    the cost is O(n log n) rather than a comparison of every pair.
+
+    An interval is covered when one earlier interval in the sweep reaches
+    at least as far. Of two identical members, the first is kept. The
+    intervals doing the covering are never covered themselves, so every
+    redundant member can be removed together without losing any address.
+
+    Returns:
+        List of Dicts: One per redundant member, in member order:
+            'type', 'target': The redundant member
+            'covered_by': List of (type, target) of the members covering it
+    '''
+
+    # Members covering no IPv4 addresses are left out
+    members= [x for x in registry.member_intervals(group) if x[2]]
+
+    # Position -> the number of its intervals that are covered, and by whom
+    covered= {}
+    covered_by= {}
+
+    # A member listed again is covered by its first listing. Leaving the
+    # repeats out of the sweep matters for group-object members, whose 
+    # expansions can be large.
+    unique= []
+    for position, first, intervals in members:
+        if position != first:
+            covered[position]= len(intervals)
+            covered_by[position]= {first}
+        else:
+            unique.append((position, intervals))
+
+    # (start, -end, position): widest first among equal starts, then the
+    # earlier member first among equal intervals
+    sweep= sorted((start, -end, position) for position, intervals in unique
+                  for start, end in intervals)
+    reach= -1
+    holder= None
+    for start, end, position in sweep:
+        end= -end
+        if end <= reach:
+            covered[position]= covered.get(position, 0) + 1
+            covered_by.setdefault(position, set()).add(holder)
+        else:
+            reach= end
+            holder= position
+
+    results= []
+    for position, first, intervals in members:
+        if covered.get(position, 0) < len(intervals): continue
+
+        type, target= group.member(position)
+        results.append({
+            'type': type,
+            'target': target,
+            'covered_by': [group.member(x) for x in
+                           sorted(covered_by[position])],
+            })
+
+    return results
+
+
+def content_hash(intervals):
+    '''Returns a canonical hash of merged (start, end) intervals, equal for
+    any two groups covering exactly the same addresses.'''
+
+    packed= array('I', [x for interval in intervals for x in interval])
+    return hashlib.blake2b(packed.tobytes(), digest_size= 16).hexdigest()
+
+
+def duplicate_groups(registry):
+    '''
+    Finds object groups covering exactly the same addresses, however their
+    members are written. Groups covering no IPv4 addresses are ignored.
+
+    Returns:
+        List of Lists of String: The names of each set of duplicates
+    '''
+
+    by_hash= {}
+    for name, intervals in registry.resolve_expansions().items():
+        if not intervals: continue
+        by_hash.setdefault(content_hash(intervals), []).append(name)
+
+    return sorted(sorted(x) for x in by_hash.values() if len(x) > 1)
+
+
+def references(registry):
+    '''
+    Summarizes the reverse reference index of a registry in one pass over 
+    its fan-in counts.
+
+    Returns:
+        Dict:
+            'fan_in': List of (name, count) for every referenced object and
+                group, most referenced first, as a guide to which entries 
+                need the most care when cleaning up
+            'objects': Names of the network objects nothing references
+            'groups': Names of the object groups nothing references. Only 
+                object groups and references added with add_reference are 
+                known, so a group used only by an unloaded access-list or 
+                NAT rule will be listed here.
+    '''
+
+    fan_in= []
+    unused_objects= []
+    unused_groups= []
+    for name, count in registry.fan_in().items():
+        if count: fan_in.append((name, count))
+        elif name in registry.objects: unused_objects.append(name)
+        else: unused_groups.append(name)
+
+    return {'fan_in': sorted(fan_in, key= lambda x: (-x[1], x[0])),
+            'objects': sorted(unused_objects),
+            'groups': sorted(unused_groups),
+            }
+
+
+def analyze(registry):
+    '''
+    Runs every analysis over the objects and groups of a registry.
+
+    Returns:
+        Dict:
+            'redundant': Group name -> its redundant members, as returned
+                by redundant_members, for the groups which have any
+            'duplicates': As returned by duplicate_groups
+            'references': As returned by references
+    '''
+
+    # Expand every group in one topological pass up front, rather than 
+    # lazily as each group's nested members are reached
+    registry.resolve_expansions()
+
+    redundant= {}
+    for name, group in registry.groups.items():
+        members= redundant_members(registry, group)
+        if members: redundant[name]= members
+
+    return {'redundant': redundant,
+            'duplicates': duplicate_groups(registry),
+            'references': references(registry),
+            }
+
+
+def main():
+
+    # Parse CLI arguments
+    parser= parse_args.make_parser()
+
+    parser.add_argument('-d', action="store_true", dest= 'database',
+        help= 'Use the latest snapshot of the host from the database\n'
+              'instead of connecting to it')
+
+    parser.add_argument('-n', action="store", dest= 'top', type= int,
+        default= 10, help= 'Number of most referenced names to list')
+
+    args= parser.parse_args()
+
+    with profiler.profile(args, 'analyze'):
+        try:
+            registry= collect.load(host= args.host,
+                                   context= args.context,
+                                   username= args.username,
+                                   password= args.password,
+                                   database= args.database,
+                                   )['registry']
+        except ValueError as e: sys.exit(e)
+
+        results= analyze(registry)
+
+        print('Redundant members:')
+        for name, members in sorted(results['redundant'].items()):
+            for x in members:
+                print('    {}: {} {} (covered by {})'.format(
+                    name, x['type'], x['target'],
+                    ', '.join(' '.join(y) for y in x['covered_by'])))
+
+        print('Duplicate groups:')
+        for names in results['duplicates']: print('    ' + ', '.join(names))
+
+        print('Unreferenced objects:')
+        for name in results['references']['objects']: print('    ' + name)
+
+        print('Unreferenced groups:')
+        for name in results['references']['groups']: print('    ' + name)
+
+        print('Most referenced:')
+        for name, count in results['references']['fan_in'][:args.top]:
+            print('    {}: {}'.format(name, count))
+
+
+if __name__ == '__main__':
+    main()
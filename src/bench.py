@@ -0,0 +1,885 @@
+'''
+Created on Oct 18, 2026
+
+Benchmarks for the FireCheck parsers, run against synthetic firewall
+output so that they can be repeated without access to a firewall.
+'''
+
+import argparse, random, re, os, time, tracemalloc, json, platform, util, \
+       objects, netarray, netindex, parse_args, profiler
+
+from datetime import datetime
+
+
+def make_objects(count= 100000, seed= 0):
+    '''Generates synthetic `show run object network` output, with objects
+    named HOST-0 and up to match the members from make_object_groups.
+
+    Optional Args:
+        count (Integer): The number of objects to generate
+        seed (Integer): Seed for the random generator, so that the same
+            arguments always generate the same output
+
+    Returns:
+        String: The generated output
+    '''
+
+    rand= random.Random(seed)
+    lines= []
+
+    for i in range(count):
+        lines.append('object network HOST-{}'.format(i))
+        lines.append(' host 10.{}.{}.{}'.format(
+            rand.randrange(256), rand.randrange(256), rand.randrange(256)))
+
+    return '\n'.join(lines) + '\n'
+
+
+def make_object_groups(groups= 1, members= 100000, seed= 0):
+    '''Generates synthetic `show run object-group network` output.
+
+    Optional Args:
+        groups (Integer): The number of object groups to generate
+        members (Integer): The number of members in each group
+        seed (Integer): Seed for the random generator, so that the same
+            arguments always generate the same output
+
+    Returns:
+        String: The generated output
+    '''
+
+    rand= random.Random(seed)
+    lines= []
+
+    for g in range(groups):
+        lines.append('object-group network GRP-{}'.format(g))
+        lines.append(' description Synthetic group {}'.format(g))
+
+        for i in range(members):
+            kind= rand.random()
+            address= '10.{}.{}.{}'.format(
+                rand.randrange(256), rand.randrange(256), rand.randrange(256))
+
+            if kind < 0.5:
+                lines.append(' network-object object HOST-{}'.format(i))
+            elif kind < 0.75:
+                lines.append(' network-object host {}'.format(address))
+            elif kind < 0.95:
+                lines.append(' network-object {} 255.255.255.0'.format(address))
+            elif g > 0:
+                lines.append(' group-object GRP-{}'.format(rand.randrange(g)))
+            else:
+                lines.append(' network-object object HOST-{}'.format(i))
+
+    return '\n'.join(lines) + '\n'
+
+
+def make_config(objects= 1000, 
+                groups= None, 
+                members= 20, 
+                depth= 3, 
+                fqdn_ratio= 0.1, 
+                seed= 0):
+    '''Generates a synthetic firewall configuration: the output of both
+    `show run object network` and `show run object-group network`.
+    
+    The objects are a mix of hosts, subnets, ranges and fqdns, about a 
+    third with a description. The object groups are split into `depth` 
+    levels. Each group above the bottom level nests a group from the level
+    below, so the deepest chain of group-objects is exactly `depth` groups.
+    Members otherwise reference objects, or list hosts and networks inline.
+    
+    Optional Args:
+        objects (Integer): The number of objects to generate
+        groups (Integer): The number of object groups. Defaults to one for 
+            every ten objects.
+        members (Integer): The number of members in each group
+        depth (Integer): The number of levels of nesting
+        fqdn_ratio (Float): The share of objects with an fqdn target
+        seed (Integer): Seed for the random generator, so that the same
+            arguments always generate the same output
+    
+    Returns:
+        Dict:
+            'objects': String: The object output
+            'groups': String: The object group output
+    '''
+    
+    rand= random.Random(seed)
+    
+    def address():
+        return '10.{}.{}.{}'.format(
+            rand.randrange(256), rand.randrange(256), rand.randrange(256))
+    
+    lines= []
+    for i in range(objects):
+        lines.append('object network OBJ-{}'.format(i))
+        if rand.random() < 0.3: 
+            lines.append(' description Synthetic object {}'.format(i))
+        
+        kind= rand.random()
+        if kind < fqdn_ratio:
+            lines.append(' fqdn host{}.example.com'.format(i))
+        elif kind < fqdn_ratio + (1 - fqdn_ratio) * 0.6:
+            lines.append(' host ' + address())
+        elif kind < fqdn_ratio + (1 - fqdn_ratio) * 0.9:
+            lines.append(' subnet {} 255.255.255.0'.format(address()))
+        else:
+            start= address()
+            lines.append(' range {} {}.255'.format(
+                start, start.rsplit('.', 1)[0]))
+    
+    object_text= '\n'.join(lines) + '\n'
+    
+    if groups is None: groups= max(1, objects // 10)
+    depth= max(1, depth)
+    
+    # The first group of each level
+    levels= [groups * x // depth for x in range(depth + 1)]
+    
+    lines= []
+    for level in range(depth):
+        for g in range(levels[level], levels[level + 1]):
+            lines.append('object-group network GRP-{}'.format(g))
+            lines.append(' description Synthetic group {}'.format(g))
+            
+            for i in range(members):
+                kind= rand.random()
+                
+                if level and (i == 0 or kind < 0.1):
+                    lines.append(' group-object GRP-{}'.format(
+                        rand.randrange(levels[level - 1], levels[level])))
+                elif kind < 0.7 and objects:
+                    lines.append(' network-object object OBJ-{}'.format(
+                        rand.randrange(objects)))
+                elif kind < 0.85:
+                    lines.append(' network-object host ' + address())
+                else:
+                    lines.append(' network-object {} 255.255.255.0'.format(
+                        address()))
+    
+    return {'objects': object_text, 'groups': '\n'.join(lines) + '\n'}
+
+
+class _legacyGroup():
+    '''The object group model used before objectGroup stored its members
+    in arrays, kept as a baseline.'''
+    def __init__(self, **kwargs):
+        self.name= kwargs.get('name')
+        self.description= kwargs.get('description')
+        self.members= kwargs.get('members', [])
+
+
+class _legacyObject():
+    '''The network object model used before networkObject used slots,
+    kept as a baseline.'''
+    def __init__(self, **kwargs):
+        self.name= kwargs.get('name')
+        self.description= kwargs.get('description')
+        self.type= kwargs.get('type')
+        self.target= kwargs.get('target')
+
+
+def _legacy_process_object_groups(strobjects):
+    '''The multi-pass object-group parser that iter_object_groups replaced,
+    kept as the baseline for bench_object_groups.'''
+
+    split_list= re.findall(r'^(\w.*?$[\s\S]*?)(?=^\w)', strobjects, re.M)
+
+    results= []
+    for x in split_list:
+        n= _legacyGroup()
+
+        for line in x.split('\n'):
+            if re.match(r'^\s*?$', line): continue
+
+            name= re.match(r'^object-group network (.*?)$', line, re.M)
+            if not (name is None or name[1] is None):
+                n.name= name[1]
+                continue
+
+            desc= re.search(r'^ description (.*?)$', line, re.M|re.I)
+            if desc is not None and desc[1] is not None:
+                n.description = desc[1]
+                continue
+
+            result= re.match(r'^ network-object (.*?) (.*?)$', line, re.M|re.I)
+            if not (result is None or
+                result.group(1) is None or
+                result.group(2) is None):
+
+                if util.is_ip(result[1]) and util.is_ip(result[2]):
+                    n.members.append(
+                    {'type': 'network',
+                     'target': result[1] + ' / ' + result[2]
+                    })
+
+                else:
+                    n.members.append(
+                        {'type': result[1],
+                         'target': result[2]
+                        })
+                continue
+
+            result= re.match(r'^ group-object (.*?)$', line, re.M|re.I)
+            if not (result is None or result[1] is None):
+                n.members.append(
+                    {'type': 'group-object',
+                     'target': result[1]
+                    })
+                continue
+
+            raise ValueError('None result found from line [{}]'.format(line))
+
+        results.append(n)
+    return results
+
+
+def _legacy_is_ip(raw_input):
+    '''util.is_ip before its patterns were precompiled, kept as the 
+    baseline for bench_util.'''
+    if not isinstance(raw_input, str):
+        raise TypeError('[{}] is not a string'.format(
+            raw_input))
+    
+    match= re.match(r'''
+        (?:
+            (?:
+                25[0-5]|          # Match 250-255
+                2[0-4][0-9]|      # Match 200-249
+                [01]?[0-9][0-9]?  # Match 0-199
+            )
+            (?:\.|\b)             # Followed by a . or a word boundry
+        ){4}                      # Repeat that four times
+        ''', raw_input, re.X)
+    
+    return bool(match)
+
+
+def _legacy_parse_ip(raw_input):
+    return re.findall(r'''
+        \b                        # Start at a word boundry
+        (?:
+            (?:
+                25[0-5]|          # Match 250-255
+                2[0-4][0-9]|      # Match 200-249
+                [01]?[0-9][0-9]?  # Match 0-199
+            )
+            (?:\.|\b)             # Followed by a . or a word boundry
+        ){4}                      # Repeat that four times
+        \b                        # End at a word boundry
+        ''', raw_input, re.X)
+
+
+def _legacy_contains_mac_address(mac):
+    return bool(re.search(r'''
+        (?:
+            [0-9A-F]{2,4}  # Match 2-4 Hex characters
+            [\:\-\.]       # Seperated by :, -, or .
+        ){2,7}             # match it between 2 and 7 times
+            [0-9A-F]{2,4}  # Followed by one last set of Hex
+        ''',
+        mac, re.I | re.X))
+
+
+def _legacy_clean_ip(ip):
+    return ''.join([x for x in ip if re.match(r'[\d\.]', x)])
+
+
+def _legacy_ucase_letters(raw_input):
+    return ''.join([x.upper() for x in raw_input if re.match(r'\w', x)])
+
+
+def make_strings(count= 100000, seed= 0):
+    '''Generates a mix of the strings the util text helpers see: valid and
+    invalid addresses, address/mask pairs, object names, MAC addresses and
+    random text, including non-ASCII characters.'''
+    
+    rand= random.Random(seed)
+    alphabet= '0123456789.abcdefABCDEF-_:/ \t\u0663\u00df\u00e9!'
+    
+    def octet():
+        return str(rand.choice([rand.randrange(256), rand.randrange(1000), 
+                                '0' + str(rand.randrange(100)), '']))
+    
+    strings= []
+    for i in range(count):
+        kind= rand.randrange(6)
+        if kind == 0: 
+            strings.append('.'.join(str(rand.randrange(256)) 
+                                    for x in range(4)))
+        elif kind == 1: 
+            strings.append('.'.join(octet() for x in 
+                                    range(rand.randrange(2, 6))))
+        elif kind == 2:
+            strings.append('{}.{}.{}.{} / 255.255.255.0'.format(
+                *(rand.randrange(256) for x in range(4))))
+        elif kind == 3: 
+            strings.append('HOST-{}'.format(i))
+        elif kind == 4:
+            strings.append(rand.choice(':-.').join(
+                '{:04x}'.format(rand.randrange(65536)) for x in range(3)))
+        else:
+            strings.append(''.join(rand.choice(alphabet) for x in 
+                                   range(rand.randrange(20))))
+    
+    return strings
+
+
+def bench_util(count= 100000, repeat= 3):
+    '''Checks that each util text helper gives the same results as the 
+    implementation it replaced over a mix of strings, then times both.
+    
+    Returns:
+        Dict: Helper name -> {'legacy', 'current', 'speedup'}
+    '''
+    
+    strings= make_strings(count)
+    pairs= [('is_ip', _legacy_is_ip, util.is_ip),
+            ('parse_ip', _legacy_parse_ip, util.parse_ip),
+            ('contains_mac_address', _legacy_contains_mac_address, 
+             util.contains_mac_address),
+            ('clean_ip', _legacy_clean_ip, util.clean_ip),
+            ('ucase_letters', _legacy_ucase_letters, util.ucase_letters),
+            ]
+    
+    print('util text helpers: {} strings'.format(count))
+    
+    results= {}
+    for name, legacy_func, current_func in pairs:
+        legacy, legacy_time= _best_time(
+            lambda: [legacy_func(x) for x in strings], repeat)
+        current, current_time= _best_time(
+            lambda: [current_func(x) for x in strings], repeat)
+        
+        for x, a, b in zip(strings, legacy, current):
+            if a != b:
+                raise AssertionError('{} disagrees on [{!r}]: {!r} != {!r}'
+                                     .format(name, x, a, b))
+        
+        results[name]= {
+            'legacy': legacy_time,
+            'current': current_time,
+            'speedup': legacy_time / current_time,
+            }
+        
+        print('    {:21}: {:0.3f} s -> {:0.3f} s, {:0.1f}x'.format(
+            name, legacy_time, current_time, results[name]['speedup']))
+    
+    # The packed form of every string that is a plain dotted quad
+    for x in strings:
+        packed= util.pack_ip(x)
+        if packed is not None: 
+            if util.int_to_ip(packed) != '.'.join(
+                    str(int(y)) for y in x.split('.')):
+                raise AssertionError('pack_ip disagrees on [{!r}]'.format(x))
+            if not _legacy_is_ip(x):
+                raise AssertionError('is_ip disagrees on [{!r}]'.format(x))
+    
+    return results
+
+
+def _best_time(func, repeat):
+    '''Returns the result of `func` and the fastest of `repeat` timed runs
+    of it, in seconds.'''
+
+    best= None
+    for i in range(repeat):
+        start= time.perf_counter()
+        result= func()
+        elapsed= time.perf_counter() - start
+        if best is None or elapsed < best: best= elapsed
+
+    return result, best
+
+
+def _cold_time(setup, func, repeat):
+    '''Like _best_time, but calls `setup` before each run, untimed, and 
+    passes its result to `func`. Used to time computations that are 
+    memoized, from a cold cache each time.'''
+    
+    best= None
+    for i in range(repeat):
+        state= setup()
+        start= time.perf_counter()
+        result= func(state)
+        elapsed= time.perf_counter() - start
+        if best is None or elapsed < best: best= elapsed
+    
+    return result, best
+
+
+def run_suite(scales= (1000, 10000, 100000), 
+              depth= 3, 
+              fqdn_ratio= 0.1, 
+              members= 20,
+              lookups= 10000,
+              repeat= 3):
+    '''Runs the benchmark suite over synthetic configurations from 
+    make_config, at each scale. Covers parsing, building the registry, 
+    group weights and expansions, the complexity report, and lookups by 
+    name and by address.
+    
+    Optional Args:
+        scales (List of Integer): The numbers of objects to generate
+        depth (Integer): Levels of group nesting, passed to make_config
+        fqdn_ratio (Float): Share of fqdn objects, passed to make_config
+        members (Integer): Members per group, passed to make_config
+        lookups (Integer): The number of names and addresses looked up
+        repeat (Integer): Timed runs per benchmark. The fastest is kept.
+    
+    Returns:
+        Dict:
+            'settings': The arguments of the run
+            'environment': {'python', 'platform', 'taken'}
+            'results': List of Dicts: {'benchmark', 'objects', 'items', 
+                'seconds'}, one per benchmark and scale
+    '''
+    
+    results= []
+    
+    def record(benchmark, scale, items, seconds):
+        results.append({'benchmark': benchmark, 
+                        'objects': scale, 
+                        'items': items, 
+                        'seconds': seconds})
+        print('    {:16}: {:9} items in {:8.3f} s, {:8.2f} us each'.format(
+            benchmark, items, seconds, seconds * 1e6 / max(items, 1)))
+    
+    for scale in scales:
+        config= make_config(objects= scale, 
+                            members= members, 
+                            depth= depth, 
+                            fqdn_ratio= fqdn_ratio)
+        print('{} objects, {} MB of output'.format(
+            scale, (len(config['objects']) + len(config['groups'])) // 2**20))
+        
+        objs, seconds= _best_time(
+            lambda: objects.process_objects(config['objects']), repeat)
+        record('parse_objects', scale, len(objs), seconds)
+        
+        groups, seconds= _best_time(
+            lambda: objects.process_object_groups(config['groups']), repeat)
+        record('parse_groups', scale, len(groups), seconds)
+        
+        registry, seconds= _best_time(
+            lambda: objects.objectRegistry(objs, groups), repeat)
+        record('registry', scale, len(registry), seconds)
+        
+        new_registry= lambda: objects.objectRegistry(objs, groups)
+        
+        weights, seconds= _cold_time(
+            new_registry, lambda x: x.resolve_weights(), repeat)
+        record('weights', scale, len(weights), seconds)
+        
+        expansions, seconds= _cold_time(
+            new_registry, lambda x: x.resolve_expansions(), repeat)
+        record('expansions', scale, len(expansions), seconds)
+        
+        # The weights are memoized by now, so only the report is timed
+        registry= new_registry()
+        registry.resolve_weights()
+        report, seconds= _best_time(
+            lambda: list(objects.format_report(groups, True)), repeat)
+        record('report', scale, len(report), seconds)
+        
+        rand= random.Random(0)
+        names= [rand.choice(objs).name for x in range(lookups)]
+        addresses= [rand.randrange(0x0a000000, 0x0b000000) 
+                    for x in range(lookups)]
+        
+        found, seconds= _best_time(
+            lambda: [registry.get_object(x) for x in names], repeat)
+        record('lookup_name', scale, len(found), seconds)
+        
+        index, seconds= _best_time(
+            lambda: netindex.build_index(registry), repeat)
+        record('address_index', scale, len(index), seconds)
+        
+        found, seconds= _best_time(
+            lambda: [index.covering(x) for x in addresses], repeat)
+        record('lookup_address', scale, len(found), seconds)
+    
+    return {'settings': {'scales': list(scales),
+                         'depth': depth, 
+                         'fqdn_ratio': fqdn_ratio,
+                         'members': members,
+                         'lookups': lookups,
+                         'repeat': repeat,
+                         },
+            'environment': {'python': platform.python_version(), 
+                            'platform': platform.platform(),
+                            'taken': datetime.now().isoformat(),
+                            },
+            'results': results,
+            }
+
+
+def compare_suites(baseline, current, tolerance= 0.1):
+    '''Compares two results of run_suite, such as one saved from the last
+    release and one from now, and prints every benchmark that got slower 
+    by more than `tolerance`.
+    
+    Returns:
+        List of Dicts: {'benchmark', 'objects', 'baseline', 'current'}: The 
+        seconds taken by each regressed benchmark
+    '''
+    
+    before= {(x['benchmark'], x['objects']): x['seconds'] 
+             for x in baseline['results']}
+    
+    regressions= []
+    for x in current['results']:
+        old= before.get((x['benchmark'], x['objects']))
+        if old is None or x['seconds'] <= old * (1 + tolerance): continue
+        
+        regressions.append({'benchmark': x['benchmark'],
+                            'objects': x['objects'],
+                            'baseline': old,
+                            'current': x['seconds'],
+                            })
+        print('Regression: {} at {} objects: {:0.3f} s -> {:0.3f} s'.format(
+            x['benchmark'], x['objects'], old, x['seconds']))
+    
+    if not regressions: print('No regressions')
+    return regressions
+
+
+def bench_object_groups(groups= 1, members= 100000, repeat= 3):
+    '''Times process_object_groups against the legacy parser on synthetic
+    object groups and checks that both produce the same members.
+
+    Returns:
+        Dict:
+            'legacy': Fastest legacy parse, in seconds
+            'current': Fastest process_object_groups parse, in seconds
+            'speedup': legacy / current
+    '''
+
+    text= make_object_groups(groups= groups, members= members)
+
+    # The legacy splitter drops the last block, so give it one to drop
+    legacy, legacy_time= _best_time(
+        lambda: _legacy_process_object_groups(
+            text + 'object-group network END\n'), repeat)
+    current, current_time= _best_time(
+        lambda: objects.process_object_groups(text), repeat)
+
+    if [(g.name, g.description, g.members) for g in legacy] != \
+       [(g.name, g.description, list(g.members)) for g in current]:
+        raise AssertionError('Parsers disagree')
+
+    result= {
+        'legacy': legacy_time,
+        'current': current_time,
+        'speedup': legacy_time / current_time,
+        }
+
+    print('process_object_groups: {} groups x {} members'.format(
+        groups, members))
+    print('    legacy  : {:0.3f} s'.format(result['legacy']))
+    print('    current : {:0.3f} s'.format(result['current']))
+    print('    speedup : {:0.1f}x'.format(result['speedup']))
+
+    return result
+
+
+def _traced_size(func):
+    '''Returns the result of `func` and the number of bytes still 
+    allocated by it when it returns.'''
+
+    tracemalloc.start()
+    try:
+        before= tracemalloc.get_traced_memory()[0]
+        result= func()
+        after= tracemalloc.get_traced_memory()[0]
+    finally: tracemalloc.stop()
+
+    return result, after - before
+
+
+def bench_memory(groups= 1, members= 100000):
+    '''Measures the memory held by parsed objects and object groups in 
+    the compact model, compared with the plain classes and member dicts 
+    it replaced.
+
+    Returns:
+        Dict:
+            'legacy': Bytes held by the legacy model
+            'current': Bytes held by the current model
+            'ratio': legacy / current
+    '''
+
+    text= make_object_groups(groups= groups, members= members)
+    parsed= objects.process_object_groups(text)
+    parsed_objects= objects.process_objects(make_objects(members))
+
+    # Build both models from the same members. The member target strings 
+    # come from the parser in both cases, so only the model is measured.
+    rows= [(g.name, g.description, list(g.iter_members())) for g in parsed]
+    object_rows= [(o.name, o.description, o.type, o.target, o.cidr) 
+                  for o in parsed_objects]
+    del parsed, parsed_objects
+
+    def build_legacy():
+        legacy= [_legacyGroup(name= name, description= description,
+                              members= [{'type': t, 'target': x} 
+                                        for t, x in items])
+                 for name, description, items in rows]
+        for name, description, type, target, cidr in object_rows:
+            o= _legacyObject(name= name, description= description, 
+                             type= type, target= target)
+            if cidr is not None: o.cidr= cidr
+            legacy.append(o)
+        return legacy
+
+    def build_current():
+        current= []
+        for name, description, items in rows:
+            g= objects.objectGroup(name= name, description= description)
+            for t, x in items: g._append(t, x)
+            current.append(g)
+        current.extend(objects.networkObject(name= name, 
+                                             description= description, 
+                                             type= type, 
+                                             target= target, 
+                                             cidr= cidr)
+                       for name, description, type, target, cidr 
+                       in object_rows)
+        return current
+
+    legacy, legacy_size= _traced_size(build_legacy)
+    del legacy
+    current, current_size= _traced_size(build_current)
+    del current
+
+    result= {
+        'legacy': legacy_size,
+        'current': current_size,
+        'ratio': legacy_size / current_size,
+        }
+
+    print('Object model memory: {} groups x {} members, {} objects'.format(
+        groups, members, members))
+    print('    legacy  : {:0.1f} MB'.format(result['legacy'] / 2**20))
+    print('    current : {:0.1f} MB'.format(result['current'] / 2**20))
+    print('    ratio   : {:0.1f}x'.format(result['ratio']))
+
+    return result
+
+
+def bench_netarray(count= 1000000, repeat= 3):
+    '''Times the network address of every address in a column, computed 
+    one string at a time with util and all at once with netarray.
+    
+    Returns:
+        Dict:
+            'scalar': Fastest util run, in seconds
+            'pack': Fastest netarray.pack of the column, in seconds
+            'vector': Fastest netarray.network_address, in seconds
+            'speedup': scalar / (pack + vector)
+    '''
+    
+    rand= random.Random(0)
+    addresses= ['10.{}.{}.{}'.format(
+        rand.randrange(256), rand.randrange(256), rand.randrange(256))
+        for i in range(count)]
+    
+    def scalar():
+        mask= util.ip_to_int('255.255.255.0')
+        return [util.ip_to_int(x) & mask for x in addresses]
+    
+    expected, scalar_time= _best_time(scalar, repeat)
+    packed, pack_time= _best_time(lambda: netarray.pack(addresses), repeat)
+    masks= netarray.cidr_to_netmask([24] * count)
+    networks, vector_time= _best_time(
+        lambda: netarray.network_address(packed, masks), repeat)
+    
+    if networks.tolist() != expected:
+        raise AssertionError('Network addresses disagree')
+    
+    result= {
+        'scalar': scalar_time,
+        'pack': pack_time,
+        'vector': vector_time,
+        'speedup': scalar_time / (pack_time + vector_time),
+        }
+    
+    print('network_address: {} addresses'.format(count))
+    print('    scalar  : {:0.3f} s'.format(result['scalar']))
+    print('    pack    : {:0.3f} s'.format(result['pack']))
+    print('    vector  : {:0.3f} s'.format(result['vector']))
+    print('    speedup : {:0.1f}x'.format(result['speedup']))
+    
+    return result
+
+
+def bench_parallel(count= 100000, workers= None, repeat= 3):
+    '''Times process_objects and process_object_groups on a synthetic 
+    configuration, parsed serially and split across worker processes, and
+    checks that both produce the same items.
+    
+    Returns:
+        Dict: 'objects' and 'groups', each:
+            'serial': Fastest serial parse, in seconds
+            'parallel': Fastest parallel parse, in seconds
+            'speedup': serial / parallel
+    '''
+    
+    if workers is None: workers= os.cpu_count() or 1
+    config= make_config(objects= count)
+    
+    def key(x):
+        if isinstance(x, objects.objectGroup):
+            return (x.name, x.description, list(x.iter_members()))
+        return (x.name, x.description, x.type, x.target, x.cidr)
+    
+    print('parse_parallel: {} objects, {} workers'.format(count, workers))
+    
+    result= {}
+    for name, parser in (('objects', objects.iter_objects), 
+                         ('groups', objects.iter_object_groups)):
+        text= config[name]
+        serial, serial_time= _best_time(
+            lambda: objects.parse_parallel(text, parser, workers= 1), repeat)
+        parallel, parallel_time= _best_time(
+            lambda: objects.parse_parallel(text, parser, workers= workers, 
+                                           threshold= 0), repeat)
+        
+        if [key(x) for x in serial] != [key(x) for x in parallel]:
+            raise AssertionError(
+                'Parallel and serial {} disagree'.format(name))
+        
+        result[name]= {
+            'serial': serial_time,
+            'parallel': parallel_time,
+            'speedup': serial_time / parallel_time,
+            }
+        
+        print('    {:8}: {:0.3f} s serial, {:0.3f} s parallel, {:0.1f}x'.format(
+            name, serial_time, parallel_time, result[name]['speedup']))
+    
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        prog= 'FireCheck - Benchmark',
+        description= 'Benchmarks the FireCheck parsers')
+
+    parser.add_argument(
+        '-g',
+        action="store",
+        dest= 'groups',
+        type= int,
+        default= 1,
+        help= 'Number of object groups',
+        )
+
+    parser.add_argument(
+        '-m',
+        action="store",
+        dest= 'members',
+        type= int,
+        default= 100000,
+        help= 'Number of members per object group',
+        )
+
+    parser.add_argument(
+        '-r',
+        action="store",
+        dest= 'repeat',
+        type= int,
+        default= 3,
+        help= 'Number of timed runs per parser',
+        )
+
+    parser.add_argument(
+        '-j',
+        action="store",
+        dest= 'workers',
+        type= int,
+        default= None,
+        help= 'Number of worker processes for parallel parsing.\n'
+              'Defaults to the number of CPUs.',
+        )
+
+    parser.add_argument(
+        '-s',
+        action="store",
+        dest= 'scales',
+        type= int,
+        nargs= '+',
+        help= 'Run the benchmark suite at these numbers of objects,\n'
+              'instead of the parser comparisons',
+        )
+
+    parser.add_argument(
+        '-d',
+        action="store",
+        dest= 'depth',
+        type= int,
+        default= 3,
+        help= 'Levels of object group nesting in the suite',
+        )
+
+    parser.add_argument(
+        '-f',
+        action="store",
+        dest= 'fqdn_ratio',
+        type= float,
+        default= 0.1,
+        help= 'Share of fqdn objects in the suite',
+        )
+
+    parser.add_argument(
+        '-o',
+        action="store",
+        dest= 'output',
+        help= 'Save the results of the suite to this JSON file',
+        )
+
+    parser.add_argument(
+        '-c',
+        action="store",
+        dest= 'baseline',
+        help= 'Compare the results of the suite with this JSON file',
+        )
+
+    parse_args.add_profile_arguments(parser)
+    
+    args= parser.parse_args()
+
+    with profiler.profile(args, 'bench'):
+        if args.scales:
+            results= run_suite(scales= args.scales, 
+                               depth= args.depth, 
+                               fqdn_ratio= args.fqdn_ratio, 
+                               repeat= args.repeat)
+        
+            if args.output:
+                with open(args.output, 'w') as outfile: 
+                    json.dump(results, outfile, indent= 1)
+        
+            if args.baseline:
+                with open(args.baseline, 'r') as infile: 
+                    compare_suites(json.load(infile), results)
+            return
+
+        bench_object_groups(groups= args.groups,
+                            members= args.members,
+                            repeat= args.repeat)
+
+        bench_memory(groups= args.groups, members= args.members)
+    
+        bench_netarray(count= args.members, repeat= args.repeat)
+    
+        bench_util(count= args.members, repeat= args.repeat)
+    
+        bench_parallel(count= args.members, 
+                       workers= args.workers, 
+                       repeat= args.repeat)
+
+
+if __name__ == '__main__':
+    main()
@@ -4,18 +4,48 @@ Created on Feb 28, 2017
 @author: Wyko
 '''
 
-from util import port_is_open, getCreds
+from util import probe_ports, clear_port_cache, getCreds
 from netmiko import NetMikoAuthenticationException
 from netmiko import NetMikoTimeoutException
 from netmiko import ConnectHandler
+from contextlib import contextmanager
 from time import sleep
-import util, gvars
+import util, gvars, instrument, re, threading, time, json, os, sqlite3
 
+# Matches a context row of `show context`. The current context is marked 
+# with a `*`, and rows starting with more spaces continue the interface 
+# list of the previous row.
+_CONTEXT_LINE= re.compile(r'^[ *]?(?P<name>[^\s*]\S*)\s+\S+')
+
+# Address or /24 subnet -> key of the credential that last logged in to it,
+# see _cred_key. Loaded from gvars.CRED_CACHE_PATH when first needed.
+_cred_cache= None
+_cred_cache_lock= threading.Lock()
+
+# Per device and command read statistics, kept in gvars.DEVICE_DB_PATH
+_LATENCY_SCHEMA= '''
+    CREATE TABLE IF NOT EXISTS latency (
+        device      TEXT NOT NULL,
+        command     TEXT NOT NULL,
+        samples     INTEGER NOT NULL,
+        latency     REAL NOT NULL,
+        throughput  REAL NOT NULL,
+        size        REAL NOT NULL,
+        PRIMARY KEY (device, command)
+    );
+'''
+_latency_lock= threading.Lock()
+
+# Weight of the newest sample in the moving averages of the statistics
+_LATENCY_WEIGHT= 0.3
+
+@instrument.timed('cli.start_cli_session')
 def start_cli_session(handler= None,
                       netmiko_platform= None,
                       ip= None, 
                       cred= None, 
-                      port= None):
+                      port= None,
+                      timeout= None):
     """
     Starts a CLI session with a remote device. Will attempt to use
     SSH first, and if it fails it will try a terminal session.
@@ -28,12 +58,15 @@ def start_cli_session(handler= None,
         handler (Object): A Netmiko-type ConnectionHandler to use. Currently using
             one of Netmiko.ConnectHandler, Netmiko.ssh_autodetect.SSHDetect. 
             Uses Netmiko.ConnectHandler by default.
+        timeout (Integer): Seconds allowed for the TCP connection, the 
+            SSH banner and the login each. Uses the handler's defaults if 
+            not supplied.
     
     Returns: 
         Dict: 
             'connection': Netmiko ConnectHandler object opened to the enable prompt 
-            'TCP_22': True if port 22 is open
-            'TCP_23': True if port 23 is open
+            'TCP_22': True if port 22 is open. False if closed or not checked
+            'TCP_23': True if port 23 is open. False if closed or not checked
             'cred': The first successful credential dict 
             
     Raises:
@@ -46,12 +79,8 @@ def start_cli_session(handler= None,
     
     assert isinstance(ip, str), proc+ ': Ip [{}] is not a string.'.format(type(ip)) 
     
-    result= {
-            'TCP_22': port_is_open(22, ip),
-            'TCP_23': port_is_open(23, ip),
-            'connection': None, 
-            'cred': None,
-            }
+    # Credentials given by the caller are not remembered in the cache
+    explicit= cred is not None
     
     _credList= []
     if cred is not None: 
@@ -59,30 +88,55 @@ def start_cli_session(handler= None,
     else:
         # Get credentials if none were acquired yet
         if len(gvars.CRED_LIST) == 0: gvars.CRED_LIST= getCreds()
-        _credList= gvars.CRED_LIST
+        
+        # Try the credentials that worked here before first
+        _credList= order_creds(ip, gvars.CRED_LIST)
     
     # Error checking        
     assert len(_credList) > 0, 'No credentials available'
-    if port: assert port is 22 or port is 23, 'Invalid port number [{}]. Should be 22 or 23.'.format(str(port))
+    if port: assert port == 22 or port == 23, 'Invalid port number [{}]. Should be 22 or 23.'.format(str(port))
     if cred: assert isinstance(cred, dict), 'Cred is type [{}]. Should be dict.'.format(type(cred))
     
+    # Only probe the ports that will actually be used, all at once
+    open_ports= probe_ports(ip, [port] if port else [22, 23])
+    
+    result= {
+            'TCP_22': open_ports.get(22, False),
+            'TCP_23': open_ports.get(23, False),
+            'connection': None, 
+            'cred': None,
+            }
+    
+    # Optional arguments for the handler
+    handler_args= {}
+    if timeout is not None: 
+        # Netmiko's own `timeout` only bounds its read loop, not connecting
+        handler_args.update(conn_timeout= timeout, 
+                            banner_timeout= timeout,
+                            auth_timeout= timeout)
+    
     # Check to see if SSH (port 22) is open
-    if not result['TCP_22']:
-        print('Port 22 is closed on %s' % ip, ip)
-    elif port is None or port is 22: 
+    if 22 not in open_ports: pass
+    elif not result['TCP_22']:
+        print('Port 22 is closed on %s' % ip)
+    else: 
         # Try logging in with each credential we have
         for cred in _credList:
             try:
                 # Establish a connection to the device
-                result['connection'] = handler(
-                    device_type=netmiko_platform,
-                    ip=  ip,
-                    username= cred['user'],
-                    password= cred['password'],
-                    secret= cred['password'],
-                )
+                with instrument.span('cli.login', host= ip, port= 22, 
+                                     user= cred['user']):
+                    result['connection'] = handler(
+                        device_type=netmiko_platform,
+                        ip=  ip,
+                        username= cred['user'],
+                        password= cred['password'],
+                        secret= cred['password'],
+                        **handler_args
+                    )
                 
                 result['cred']= cred
+                if not explicit: record_cred(ip, cred)
 #                 print('Successful ssh auth to %s using %s, %s' % (ip, cred['user'], cred['password'][:2]))
                 
                 return result
@@ -96,21 +150,26 @@ def start_cli_session(handler= None,
                 break
     
     # Check to see if port 23 (telnet) is open
-    if not result['TCP_23']:
-        print('Port 23 is closed on %s' % ip, ip)
-    elif port is None or port is 23:
+    if 23 not in open_ports: pass
+    elif not result['TCP_23']:
+        print('Port 23 is closed on %s' % ip)
+    else:
         for cred in _credList:
             try:
                 # Establish a connection to the device
-                result['connection'] = handler(
-                    device_type=netmiko_platform + '_telnet',
-                    ip=  ip,
-                    username= cred['user'],
-                    password= cred['password'],
-                    secret= cred['password'],
-                )
+                with instrument.span('cli.login', host= ip, port= 23, 
+                                     user= cred['user']):
+                    result['connection'] = handler(
+                        device_type=netmiko_platform + '_telnet',
+                        ip=  ip,
+                        username= cred['user'],
+                        password= cred['password'],
+                        secret= cred['password'],
+                        **handler_args
+                    )
                 
                 result['cred']= cred
+                if not explicit: record_cred(ip, cred)
 #                 print('Successful telnet auth to %s using %s, %s' % (ip, cred['user'], cred['password'][:2]))
                 
                 return result
@@ -124,9 +183,114 @@ def start_cli_session(handler= None,
                 # If the device is unavailable, don't try any other credentials
                 break
     
+    # Probe the host again on the next attempt, in case it was only 
+    # unreachable for a moment
+    clear_port_cache(ip)
     raise IOError('No CLI connection could be established')
 
 
+def _cred_key(cred, creds):
+    '''Identifies a credential in the credential cache by its position in
+    the credential list and its username, so that credentials sharing a 
+    username are told apart without saving anything derived from the 
+    password. Returns None for a credential that is not in the list.'''
+    
+    for i, x in enumerate(creds):
+        if x is cred or x == cred: 
+            return '{}:{}'.format(i, cred.get('user'))
+    
+    return None
+
+
+def _cred_subnet(ip):
+    '''Returns the /24 containing an IPv4 address, or None for a hostname.'''
+    if not util.is_ip(ip): return None
+    return '.'.join(ip.split('.')[:3]) + '.0/24'
+
+
+def _load_cred_cache():
+    '''Loads the credential cache from disk the first time it is needed. 
+    Must hold _cred_cache_lock.'''
+    
+    global _cred_cache
+    if _cred_cache is not None: return _cred_cache
+    
+    try: 
+        with open(gvars.CRED_CACHE_PATH, 'r') as infile: 
+            _cred_cache= json.load(infile)
+    except (IOError, ValueError): 
+        _cred_cache= {}
+    
+    return _cred_cache
+
+
+def order_creds(ip, creds):
+    '''
+    Orders a list of credentials so the most likely to succeed on a host 
+    come first: the one that last logged in to the host, then the one that 
+    last logged in to another host in the same /24, then the rest in their
+    original order.
+    
+    Args:
+        ip (String): The address of the host
+        creds (List of Dicts): The credentials to order
+        
+    Returns:
+        List of Dicts: The same credentials, reordered
+    '''
+    
+    with _cred_cache_lock: 
+        cache= _load_cred_cache()
+        likely= [cache.get(ip), cache.get(_cred_subnet(ip))]
+    
+    keys= [_cred_key(x, creds) for x in creds]
+    
+    rank= {key: i for i, key in enumerate(likely) if key is not None}
+    
+    # sorted is stable, so the other credentials keep their order
+    order= sorted(range(len(creds)), 
+                  key= lambda i: rank.get(keys[i], len(likely)))
+    return [creds[i] for i in order]
+
+
+def record_cred(ip, cred, creds= None):
+    '''
+    Records that a credential logged in to a host, for both the host and 
+    its /24, and saves the credential cache under gvars.RUN_PATH. Only the
+    position and username of the credential are saved, see _cred_key.
+    
+    Optional Args:
+        creds (List of Dicts): The credential list `cred` came from. 
+            Defaults to gvars.CRED_LIST. Credentials not in it are not
+            recorded.
+    '''
+    
+    if creds is None: creds= gvars.CRED_LIST
+    key= _cred_key(cred, creds)
+    if key is None: return
+    
+    subnet= _cred_subnet(ip)
+    
+    with _cred_cache_lock:
+        cache= _load_cred_cache()
+        if cache.get(ip) == key and (subnet is None or 
+                                     cache.get(subnet) == key): 
+            return
+        
+        cache[ip]= key
+        if subnet is not None: cache[subnet]= key
+        
+        # Write to a temporary file first so a crash can't corrupt the cache
+        try:
+            os.makedirs(os.path.dirname(gvars.CRED_CACHE_PATH), exist_ok= True)
+            with open(gvars.CRED_CACHE_PATH + '.tmp', 'w') as outfile: 
+                json.dump(cache, outfile, indent= 1, sort_keys= True)
+            os.replace(gvars.CRED_CACHE_PATH + '.tmp', gvars.CRED_CACHE_PATH)
+        except OSError as e:
+            print('Could not save the credential cache: {}'.format(e))
+
+
+@instrument.timed('cli.enable')
 def enable(connection, attempts= 3):
     '''Enter enable mode.
     
@@ -152,41 +316,579 @@ def enable(connection, attempts= 3):
 #             print('Enable successful on attempt %s' % (str(i+1)))
             return True
         
+@instrument.timed('cli.connect_firewall')
 def connect_firewall(host, 
                      user= None, 
                      password= None,
                      context= None,
+                     timeout= None,
                      ):
     '''
     Establishes a connection to a firewall and enters enable mode.
     
+    Optional Args:
+        user (String): The username to log in with. Without it, every 
+            credential in gvars.CRED_LIST is tried, the one that last 
+            worked on this host first.
+        timeout (Integer): Connection timeout in seconds, passed to Netmiko
+    
     Returns:
         connection: A Netmiko connection object
     ''' 
     
+    cred= None
+    if user is not None: 
+        cred= {'user': user, 'password': password, 'type': None}
+    
     connection= start_cli_session(
                       handler= ConnectHandler, 
                       netmiko_platform= 'cisco_asa_ssh', 
                       ip= host,
-                      cred={'user': user,
-                            'password': password,
-                            'type': None
-                            },
-                      port= 22
+                      cred= cred,
+                      port= 22,
+                      timeout= timeout,
                       )['connection']
         
     if not enable(connection): return False
     
     # Switch contexts   
     if context is not None: 
-        print('Changing to context {}'.format(context))
-        connection.send_command('changeto context {}'.format(context))
+        try: change_context(connection, context)
+        except: 
+            connection.disconnect()
+            raise
     
     return connection  
 
 
+@instrument.timed('cli.change_context')
+def change_context(connection, context):
+    '''Switches an enabled firewall connection to another security 
+    context. Use `system` for the system execution space.
+    
+    Raises:
+        IOError: If the firewall refuses, such as for a context that does 
+            not exist or on a single-context firewall
+    '''
+    
+    print('Changing to context {}'.format(context))
+    
+    if context == 'system': command= 'changeto system'
+    else: command= 'changeto context {}'.format(context)
+    
+    _check_output(command, connection.send_command(command))
 
 
+def list_contexts(connection):
+    '''
+    Lists the security contexts configured on a multi-context firewall. 
+    The connection is left in the system execution space.
+    
+    Args:
+        connection (Object): A Netmiko connection in enable mode
+        
+    Returns:
+        List of String: The context names, in the order the firewall 
+        lists them
+    
+    Raises:
+        IOError: If the firewall is not in multiple context mode, or lists
+            no contexts
+    '''
+    
+    change_context(connection, 'system')
+    output= _check_output('show context', 
+                          connection.send_command('show context'))
+    
+    contexts= []
+    for line in output.splitlines():
+        match= _CONTEXT_LINE.match(line)
+        if match is None: continue
+        
+        name= match.group('name')
+        if name in ('Context', 'Total'): continue
+        
+        contexts.append(name)
+    
+    if not contexts:
+        raise IOError('[show context] listed no contexts')
+    
+    return contexts
+
+
+def _check_output(command, output):
+    '''Returns the output of a command, or raises IOError with the 
+    firewall's message if the command was rejected.'''
+    
+    for line in output.splitlines():
+        if line.lstrip().startswith('ERROR:'):
+            raise IOError('[{}] failed: {}'.format(command, line.strip()))
+    
+    return output
+
+
+def _latency_db():
+    db= sqlite3.connect(gvars.DEVICE_DB_PATH, timeout= 30)
+    db.executescript(_LATENCY_SCHEMA)
+    return db
+
+
+def latency_stats(device, command):
+    '''
+    Returns the read statistics recorded for a command on a device. 
+    
+    Returns:
+        Dict: {'samples', 'latency', 'throughput', 'size'}: The number of 
+        reads recorded, and moving averages of the seconds before the first
+        output, the bytes per second after it and the bytes of output. None
+        if the command has never been recorded on the device.
+    '''
+    
+    try:
+        with _latency_lock:
+            db= _latency_db()
+            try: 
+                row= db.execute(
+                    'SELECT samples, latency, throughput, size FROM latency '
+                    'WHERE device = ? AND command = ?', 
+                    (device, command)).fetchone()
+            finally: db.close()
+    except sqlite3.Error: return None
+    
+    if row is None: return None
+    return dict(zip(('samples', 'latency', 'throughput', 'size'), row))
+
+
+def record_latency(device, command, latency, elapsed, size):
+    '''
+    Records one read of a command on a device, folding it into the moving
+    averages saved in gvars.DEVICE_DB_PATH.
+    
+    Args:
+        device (String): The host
+        command (String): The command
+        latency (Float): Seconds from sending the command to its first output
+        elapsed (Float): Seconds from sending the command to the prompt
+        size (Integer): Bytes of output
+    '''
+    
+    # Throughput is only meaningful once the output has started
+    throughput= size / max(elapsed - latency, 0.001)
+    
+    try:
+        with _latency_lock:
+            os.makedirs(os.path.dirname(gvars.DEVICE_DB_PATH), exist_ok= True)
+            db= _latency_db()
+            try:
+                with db:
+                    row= db.execute(
+                        'SELECT samples, latency, throughput, size FROM '
+                        'latency WHERE device = ? AND command = ?', 
+                        (device, command)).fetchone()
+                    
+                    if row is not None:
+                        w= _LATENCY_WEIGHT
+                        latency= w * latency + (1 - w) * row[1]
+                        throughput= w * throughput + (1 - w) * row[2]
+                        size= w * size + (1 - w) * row[3]
+                    
+                    db.execute(
+                        'INSERT OR REPLACE INTO latency VALUES '
+                        '(?, ?, ?, ?, ?, ?)', 
+                        (device, command, (row[0] if row else 0) + 1, 
+                         latency, throughput, size))
+            finally: db.close()
+    except (OSError, sqlite3.Error) as e:
+        print('Could not save the latency statistics: {}'.format(e))
+
+
+def read_timeout(device, command):
+    '''
+    Returns how many seconds to wait for output from a command, scaled to
+    the latency, throughput and output size recorded for it on the device.
+    Commands that have never been recorded get gvars.READ_TIMEOUT_MAX.
+    '''
+    
+    stats= latency_stats(device, command) if device else None
+    if stats is None: return gvars.READ_TIMEOUT_MAX
+    
+    expected= stats['latency'] + stats['size'] / max(stats['throughput'], 1)
+    return min(max(gvars.READ_TIMEOUT_SCALE * expected, 
+                   gvars.READ_TIMEOUT_MIN), 
+               gvars.READ_TIMEOUT_MAX)
+
+
+def stream_command(connection, command, timeout= None, tee= None, poll= 0.2,
+                   deadline= None):
+    '''
+    Sends a command and yields its output as it arrives, instead of waiting
+    for all of it like `send_command_expect`. The output is passed on in 
+    runs of complete lines, so it can be fed straight into a parser through
+    objects.iter_lines. Reading stops as soon as the device prompt appears,
+    so a small command returns in well under a second.
+    
+    The time to the first output, the throughput and the size of every 
+    successful read are recorded per device, and later reads of the same 
+    command scale their timeout to them.
+    
+    Args:
+        connection (Object): A Netmiko connection in enable mode
+        command (String): The command to send
+    
+    Optional Args:
+        timeout (Integer): Seconds to wait for more output before giving up.
+            Defaults to read_timeout for the device and command.
+        tee (File): If supplied, everything yielded is also written to it
+        poll (Float): The longest wait between reads of an idle channel. 
+            Reads start a few milliseconds apart and back off to this.
+        deadline (Float): A time.monotonic() time by which the whole output
+            must have been read, however steadily it is arriving
+    
+    Yields:
+        String: Chunks of the output, each ending with a newline, without 
+        the command echo or the final prompt
+    
+    Raises:
+        IOError: If no output arrives for `timeout` seconds before the 
+            prompt is seen, or the deadline passes. The rest of the output
+            is then left unread, so the connection should be closed.
+    
+    If the generator is closed before the prompt is seen, such as when the 
+    parser reading it fails, the rest of the output is read and thrown 
+    away, so that it is not taken for the output of the next command. If 
+    that fails too, the connection is closed rather than left out of step.
+    '''
+    
+    device= getattr(connection, 'host', None)
+    if timeout is None: timeout= read_timeout(device, command)
+    
+    prompt= re.compile(r'{}\S*[#>]\s*$'.format(
+        re.escape(connection.base_prompt)))
+    
+    connection.write_channel(connection.normalize_cmd(command))
+    
+    pending= ''
+    echo= True
+    size= 0
+    latency= None
+    wait= 0.005
+    waited= 0
+    start= time.monotonic()
+    idle_deadline= start + timeout
+    instrument.count('cli.commands')
+    
+    try:
+        while True:
+            if deadline is not None and time.monotonic() > deadline:
+                raise IOError('The output of [{}] was not read before the '
+                              'deadline'.format(command))
+            
+            data= connection.read_channel()
+        
+            if not data:
+                if time.monotonic() > idle_deadline:
+                    instrument.count('cli.read_timeouts')
+                    raise IOError(
+                        'Timed out waiting for the output of [{}]'.format(
+                            command))
+                sleep(wait)
+                waited+= wait
+                wait= min(wait * 2, poll)
+                continue
+        
+            now= time.monotonic()
+            if latency is None: latency= now - start
+            idle_deadline= now + timeout
+            wait= 0.005
+        
+            size+= len(data)
+            pending+= data.replace('\r\n', '\n')
+        
+            # Pass on the complete lines, and keep the partial last line, 
+            # which may be the prompt
+            cut= pending.rfind('\n') + 1
+            if cut:
+                text= pending[:cut]
+                pending= pending[cut:]
+            
+                if echo:
+                    echo= False
+                    first, _, rest= text.partition('\n')
+                    if command.strip() in first: text= rest
+            
+                if text:
+                    if tee is not None: tee.write(text)
+                    yield text
+        
+            if prompt.match(pending): 
+                if device: 
+                    record_latency(device, command, latency, 
+                                   time.monotonic() - start, size)
+            
+                # Spans would be split across the yields, so count instead
+                instrument.count('cli.read_bytes', size)
+                instrument.count('cli.read_wait_ns', int(waited * 1e9))
+                instrument.count('cli.first_output_ns', int(latency * 1e9) 
+                                 if latency is not None else 0)
+                return
+    except GeneratorExit:
+        _drain(connection, prompt, pending, timeout)
+        raise
+
+
+def _drain(connection, prompt, pending, timeout):
+    '''Reads and discards the rest of a command's output, up to the 
+    prompt. Closes the connection if the prompt does not appear within 
+    `timeout` seconds of the last output.'''
+    
+    instrument.count('cli.drains')
+    deadline= time.monotonic() + timeout
+    
+    while not prompt.match(pending):
+        data= connection.read_channel()
+        
+        if not data:
+            if time.monotonic() > deadline:
+                connection.disconnect()
+                raise IOError('Timed out discarding the rest of the output, '
+                              'so the connection was closed')
+            sleep(0.05)
+            continue
+        
+        deadline= time.monotonic() + timeout
+        pending= (pending + data.replace('\r\n', '\n')).rpartition('\n')[2]
+
+
+def run_command(connection, command, timeout= None):
+    '''Sends a command and returns its whole output, reading it like 
+    stream_command. A replacement for `send_command_expect` with a fixed 
+    delay_factor.'''
+    return ''.join(stream_command(connection, command, timeout= timeout))
+
+
+class sessionPool():
+    '''
+    A pool of firewall connections that are already logged in and in enable
+    mode, so that a workflow running several commands against the same 
+    device pays for the SSH handshake, login and `enable` only once.
+    
+    Connections are keyed by (host, context, user). Idle connections are 
+    checked with a prompt probe before they are handed out, and are closed 
+    once they have been idle for too long. The number of connections open 
+    to each device is capped, so that the pool cannot use up the device's
+    vty lines.
+    
+    Optional Args:
+        max_per_device (Integer): The most connections to hold open to one 
+            host, idle or in use. Defaults to 2.
+        idle_timeout (Integer): Seconds an idle connection is kept before 
+            it is closed. Defaults to 300.
+        factory (Function): Opens a new connection. Called with the same 
+            keyword arguments as connect_firewall, which is the default.
+    
+    Usage:
+        with pool.session('10.0.0.1', user= 'admin', password= 'x') as c:
+            c.send_command('show version')
+    '''
+    
+    def __init__(self, max_per_device= 2, idle_timeout= 300, factory= None):
+        self.max_per_device= max_per_device
+        self.idle_timeout= idle_timeout
+        self.factory= factory or connect_firewall
+        
+        # (host, context, user) -> list of [connection, last used]
+        self._idle= {}
+        
+        # host -> number of connections open, idle or in use
+        self._open= {}
+        
+        # id(connection) -> key, for connections that are in use
+        self._keys= {}
+        
+        self._lock= threading.Condition()
+    
+    def acquire(self, host, 
+                user= None, 
+                password= None, 
+                context= None, 
+                timeout= None,
+                wait= None):
+        '''
+        Takes an enabled connection out of the pool, opening a new one if no
+        healthy idle connection is available. Give it back with release.
+        
+        Optional Args:
+            timeout (Integer): Connection timeout in seconds, passed to 
+                Netmiko when a new connection is opened
+            wait (Integer): Seconds to wait for a free slot when the device
+                is already at max_per_device. Defaults to waiting as long
+                as it takes.
+        
+        Returns:
+            connection: A Netmiko connection object
+            
+        Raises:
+            IOError: If no slot became free in time, or the connection 
+                could not be established
+        '''
+        
+        key= (host, context, user)
+        deadline= None if wait is None else time.monotonic() + wait
+        self.evict_idle()
+        
+        # Connections are probed and closed outside the lock, so that one 
+        # slow device cannot hold up the sessions of every other host
+        while True:
+            stale= []
+            with self._lock: 
+                connection= self._take(key, stale, deadline, wait)
+            for x in stale: self._close(x)
+            
+            # None means a slot was reserved for a new connection
+            if connection is None: break
+            
+            if self._healthy(connection):
+                with self._lock: self._keys[id(connection)]= key
+                return connection
+            
+            with self._lock: self._free(host)
+            self._close(connection)
+        
+        try:
+            connection= self.factory(host= host,
+                                     user= user,
+                                     password= password,
+                                     context= context,
+                                     timeout= timeout,
+                                     )
+            if not connection: 
+                raise IOError('Could not enter enable mode on {}'.format(host))
+        except:
+            with self._lock: self._free(host)
+            raise
+        
+        with self._lock: self._keys[id(connection)]= key
+        return connection
+    
+    def release(self, connection, discard= False):
+        '''
+        Returns a connection taken with acquire to the pool.
+        
+        Optional Args:
+            discard (Boolean): If True, close the connection instead of 
+                keeping it, such as after an error left it in an unknown 
+                state
+        '''
+        
+        with self._lock:
+            key= self._keys.pop(id(connection))
+            
+            if discard: self._free(key[0])
+            else:
+                self._idle.setdefault(key, []).append(
+                    [connection, time.monotonic()])
+                self._lock.notify_all()
+        
+        if discard: self._close(connection)
+    
+    @contextmanager
+    def session(self, host, **kwargs):
+        '''Acquires a connection for the duration of a `with` block. The 
+        connection is discarded if the block raises an exception. Takes the
+        same arguments as acquire.'''
+        
+        connection= self.acquire(host, **kwargs)
+        try: yield connection
+        except:
+            self.release(connection, discard= True)
+            raise
+        else: self.release(connection)
+    
+    def evict_idle(self):
+        '''Closes every connection that has been idle for longer than 
+        idle_timeout.'''
+        
+        now= time.monotonic()
+        expired= []
+        
+        with self._lock:
+            for key, entries in self._idle.items():
+                for entry in [x for x in entries 
+                              if now - x[1] > self.idle_timeout]:
+                    entries.remove(entry)
+                    self._free(key[0])
+                    expired.append(entry[0])
+        
+        for connection in expired: self._close(connection)
+    
+    def close(self):
+        '''Closes every idle connection. Connections that are in use are
+        left open, and go back into the pool as usual when they are 
+        released, so call close again once they have been.'''
+        
+        idle= []
+        with self._lock:
+            for key, entries in self._idle.items():
+                for connection, last_used in entries: 
+                    self._free(key[0])
+                    idle.append(connection)
+            
+            self._idle.clear()
+        
+        for connection in idle: self._close(connection)
+    
+    def _take(self, key, stale, deadline, wait):
+        '''Takes an idle connection for `key`, or reserves a slot for a new
+        one and returns None, waiting for a free slot if the host is at 
+        max_per_device. Idle connections of the host with other keys may 
+        be given up to make room; they are added to `stale` for the caller
+        to close. Must hold the lock.'''
+        
+        host= key[0]
+        
+        while True:
+            idle= self._idle.get(key)
+            if idle: return idle.pop()[0]
+            
+            # Give up an idle connection with a different key to make room
+            if self._open.get(host, 0) >= self.max_per_device:
+                for other, entries in self._idle.items():
+                    if other[0] == host and entries:
+                        stale.append(entries.pop()[0])
+                        self._free(host)
+                        break
+            
+            if self._open.get(host, 0) < self.max_per_device:
+                self._open[host]= self._open.get(host, 0) + 1
+                return None
+            
+            remaining= None
+            if deadline is not None: 
+                remaining= deadline - time.monotonic()
+                if remaining <= 0:
+                    raise IOError('No free session to {} after {} s'.format(
+                        host, wait))
+            
+            self._lock.wait(remaining)
+    
+    def _free(self, host):
+        '''Frees the slot of a connection that is being closed. Must hold 
+        the lock.'''
+        
+        self._open[host]-= 1
+        self._lock.notify_all()
+    
+    @staticmethod
+    def _close(connection):
+        try: connection.disconnect()
+        except Exception: pass
+    
+    @staticmethod
+    def _healthy(connection):
+        '''Probes the prompt to check that the connection is still alive 
+        and in enable mode.'''
+        try: return connection.find_prompt().strip().endswith('#')
+        except Exception: return False
 
 
 if __name__ == '__main__':
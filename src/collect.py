@@ -0,0 +1,523 @@
+'''
+Created on Oct 18, 2026
+
+Collects the network objects and object groups from many firewalls and
+contexts at once.
+'''
+
+import sys, time, gvars, parse_args, objects, cli, db, instrument, profiler
+
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+
+def read_inventory(path):
+    '''
+    Reads an inventory file of firewalls to collect from. Each line holds a
+    host, optionally followed by the contexts to collect from it. A context
+    of `*` collects every context on the host over a single session. Blank
+    lines and lines starting with `#` are ignored.
+
+        10.0.0.1
+        10.0.0.2 admin CTX-1 CTX-2
+        10.0.0.3 *
+
+    Args:
+        path (String): The path of the inventory file
+
+    Returns:
+        List of Dicts: {'host', 'context'}, one per host and context
+    '''
+
+    inventory= []
+    with open(path, 'r') as infile:
+        for line in infile:
+            fields= line.split()
+            if not fields or fields[0].startswith('#'): continue
+
+            host= fields[0]
+            for context in fields[1:] or [None]:
+                inventory.append({'host': host, 'context': context})
+
+    return inventory
+
+
+def collect_one(host,
+                context= None,
+                username= None,
+                password= None,
+                timeout= None,
+                retries= 2,
+                pool= None,
+                store= False,
+                host_timeout= None):
+    '''
+    Collects the objects from a single firewall context, retrying with an
+    increasing delay if the collection fails.
+
+    Optional Args:
+        timeout (Integer): Seconds allowed for connecting and for logging in
+        pool (cli.sessionPool): Take the connection from this pool rather
+            than opening one directly
+        store (Boolean): If True, only parse what changed since the last 
+            snapshot of the context, then save the result as a new snapshot
+        host_timeout (Integer): Seconds allowed for the whole collection,
+            including waiting for a session, logging in, reading and every
+            retry. No limit if None.
+
+    Returns:
+        Dict:
+            'host': The host
+            'context': The context, or None
+            'result': The result of objects.getObjects_fromFirewall, or None
+                if every attempt failed
+            'error': The last error, or None if the collection succeeded.
+                Errors reading or saving snapshots are recorded here too.
+            'attempts': The number of attempts made
+            'elapsed': Total seconds spent on this host
+            'snapshot': The id of the saved snapshot, if `store` is True
+    '''
+
+    entry= {
+        'host': host,
+        'context': context,
+        'result': None,
+        'error': None,
+        'attempts': 0,
+        'elapsed': 0,
+        }
+
+    start= time.perf_counter()
+    deadline= _deadline(host_timeout)
+    previous= None
+    loaded= not store
+
+    for attempt in range(retries + 1):
+        if _expired(deadline):
+            entry['error']= _timed_out(host, host_timeout)
+            break
+        
+        entry['attempts']= attempt + 1
+
+        try:
+            if not loaded:
+                previous= load_previous(host, context)
+                loaded= True
+
+            entry['result']= objects.getObjects_fromFirewall(
+                host,
+                username= username,
+                password= password,
+                context= context,
+                timeout= _bound(timeout, deadline),
+                save= False,
+                pool= pool,
+                previous= previous,
+                deadline= deadline,
+                )
+        except Exception as e:
+            entry['error']= e
+
+            # Rest a little longer each time and then try again
+            if attempt < retries:
+                time.sleep(gvars.BASE_DELAY + gvars.DELAY_INCREASE * attempt)
+        else:
+            entry['error']= None
+            if store:
+                # Collected, but not saved: keep the result and report the
+                # database error rather than collecting it all again
+                try: entry['snapshot']= save(entry)
+                except Exception as e: entry['error']= e
+            break
+
+    entry['elapsed']= time.perf_counter() - start
+    return entry
+
+
+def collect_contexts(host,
+                     contexts= None,
+                     username= None,
+                     password= None,
+                     timeout= None,
+                     retries= 2,
+                     store= False,
+                     host_timeout= None):
+    '''
+    Collects the objects from several contexts of a multi-context firewall
+    over a single authenticated session. Only the login is retried; a
+    context that fails is recorded and the rest are still collected.
+
+    Optional Args:
+        contexts (List of String): The contexts to collect from. Defaults to
+            every context listed by `show context`.
+        timeout (Integer): Seconds allowed for connecting and for logging in
+        store (Boolean): If True, only parse what changed since the last 
+            snapshot of each context, then save the results as new 
+            snapshots
+        host_timeout (Integer): Seconds allowed for the whole host, every
+            context included. Contexts not collected by then fail.
+
+    Returns:
+        List of Dicts: One entry per context, as returned by collect_one,
+        or a single failed entry with the context `*` if the login failed
+        or no contexts were found
+    '''
+
+    start= time.perf_counter()
+    deadline= _deadline(host_timeout)
+    connection= None
+    error= None
+
+    for attempt in range(retries + 1):
+        if _expired(deadline):
+            error= _timed_out(host, host_timeout)
+            break
+        
+        try:
+            connection= cli.connect_firewall(user= username,
+                                             password= password,
+                                             host= host,
+                                             timeout= _bound(timeout, deadline),
+                                             )
+            if contexts is None: contexts= cli.list_contexts(connection)
+        except Exception as e:
+            if connection: connection.disconnect()
+            connection= None
+            error= e
+
+            # Rest a little longer each time and then try again
+            if attempt < retries:
+                time.sleep(gvars.BASE_DELAY + gvars.DELAY_INCREASE * attempt)
+        else: break
+
+    # Report the host rather than silently returning no entries for it
+    if connection is not None and not contexts:
+        connection.disconnect()
+        connection= None
+        error= IOError('No contexts to collect from {}'.format(host))
+
+    if connection is None:
+        return [{
+            'host': host,
+            'context': '*',
+            'result': None,
+            'error': error,
+            'attempts': attempt + 1,
+            'elapsed': time.perf_counter() - start,
+            }]
+
+    entries= []
+    try:
+        for context in contexts:
+            context_start= time.perf_counter()
+            entry= {
+                'host': host,
+                'context': context,
+                'result': None,
+                'error': None,
+                'attempts': attempt + 1,
+                }
+
+            try:
+                if _expired(deadline): 
+                    raise _timed_out(host, host_timeout)
+                
+                previous= load_previous(host, context) if store else None
+                cli.change_context(connection, context)
+                entry['result']= objects.getObjects_fromConnection(
+                    connection, previous= previous, deadline= deadline)
+            except Exception as e:
+                entry['error']= e
+            else:
+                if store:
+                    try: entry['snapshot']= save(entry)
+                    except Exception as e: entry['error']= e
+
+            entry['elapsed']= time.perf_counter() - context_start
+            entries.append(entry)
+    finally:
+        connection.disconnect()
+
+    return entries
+
+
+def _deadline(host_timeout):
+    '''Converts a number of seconds from now into a time.monotonic() 
+    deadline, or None for no deadline.'''
+    if host_timeout is None: return None
+    return time.monotonic() + host_timeout
+
+
+def _expired(deadline):
+    return deadline is not None and time.monotonic() >= deadline
+
+
+def _bound(timeout, deadline):
+    '''Shortens a timeout so that it ends by the deadline.'''
+    if deadline is None: return timeout
+    
+    remaining= max(deadline - time.monotonic(), 1)
+    return remaining if timeout is None else min(timeout, remaining)
+
+
+def _timed_out(host, host_timeout):
+    return IOError('Gave up on {} after {} s'.format(host, host_timeout))
+
+
+def load_previous(host, context= None):
+    '''Loads the most recent snapshot of one context of a host from the
+    database, as returned by db.load_snapshot, or None if it has never been
+    saved.'''
+
+    database= db.connect()
+    try:
+        snapshot= db.latest_snapshot(database, host, context)
+        if snapshot is None: return None
+        return db.load_snapshot(database, snapshot)
+    finally: database.close()
+
+
+def save(entry):
+    '''Saves a successfully collected context to the database as a new
+    snapshot, and returns the snapshot id.'''
+
+    database= db.connect()
+    try:
+        return db.save_snapshot(database,
+                                entry['host'],
+                                entry['context'],
+                                entry['result']['objects'],
+                                entry['result']['groups'],
+                                hashes= entry['result'].get('hashes'),
+                                )
+    finally: database.close()
+
+
+def load(host= None,
+         context= None,
+         username= None,
+         password= None,
+         database= False):
+    '''
+    Loads the objects of one firewall context from wherever they are 
+    available: the latest snapshot in the database, the firewall itself, or
+    the files saved by the last collection.
+    
+    Optional Args:
+        host (String): The firewall. Without it, the objects are read from
+            `objects.txt` and `objectgroups.txt`.
+        database (Boolean): If True, load the latest snapshot of the host
+            and context instead of connecting to it
+    
+    Returns:
+        Dict: {'objects', 'groups', 'registry'}, and anything else the
+        source provides
+    
+    Raises:
+        ValueError: If `database` is True and the context has no snapshot
+    '''
+    
+    if database:
+        database= db.connect()
+        try:
+            snapshot= db.latest_snapshot(database, host, context)
+            if snapshot is None:
+                raise ValueError('No snapshot of [{}{}] in the database'.format(
+                    host, '/' + context if context else ''))
+            return db.load_snapshot(database, snapshot)
+        finally: database.close()
+    
+    if host:
+        return objects.getObjects_fromFirewall(host,
+                                               username= username,
+                                               password= password,
+                                               context= context,
+                                               save= False,
+                                               )
+    
+    return objects.getObjects_fromFile()
+
+
+def collect(inventory,
+            username= None,
+            password= None,
+            workers= 8,
+            timeout= 60,
+            retries= 2,
+            store= False,
+            host_timeout= 600):
+    '''
+    Collects the objects from every firewall context in the inventory,
+    using a bounded pool of worker threads. Progress is printed as each
+    context finishes, followed by a summary. Contexts listed separately 
+    for the same host share a session pool, which caps the number of 
+    sessions open to each host.
+
+    Args:
+        inventory (List of Dicts): {'host', 'context'}, as returned by
+            read_inventory
+
+    Optional Args:
+        workers (Integer): The most firewalls to collect from at once
+        timeout (Integer): Seconds allowed for connecting and for logging 
+            in to a host
+        retries (Integer): How many times to retry a failed context
+        host_timeout (Integer): Seconds allowed for each inventory entry as
+            a whole: waiting for a session, logging in, reading and every 
+            retry. No limit if None.
+        store (Boolean): If True, save each collected context as a snapshot
+            in the database at gvars.MAIN_DB_PATH, parsing only what changed
+            since the previous snapshot
+
+    Returns:
+        Dict: (host, context) -> the result of collect_one
+    '''
+
+    results= {}
+    start= time.perf_counter()
+    sessions= cli.sessionPool()
+
+    with ThreadPoolExecutor(max_workers= workers) as pool:
+        futures= {}
+        for x in inventory:
+            # Every context of the host, over one session
+            if x.get('context') == '*':
+                futures[pool.submit(collect_contexts,
+                                           x['host'],
+                                           username= username,
+                                           password= password,
+                                           timeout= timeout,
+                                           retries= retries,
+                                           store= store,
+                                           host_timeout= host_timeout,
+                                           )]= x
+            
+            else:
+                futures[pool.submit(collect_one,
+                                           x['host'],
+                                           context= x.get('context'),
+                                           username= username,
+                                           password= password,
+                                           timeout= timeout,
+                                           retries= retries,
+                                           pool= sessions,
+                                           store= store,
+                                           host_timeout= host_timeout,
+                                           )]= x
+
+        for i, future in enumerate(as_completed(futures)):
+            # One host going wrong must not end the whole collection
+            try: entries= future.result()
+            except Exception as e:
+                entries= {'host': futures[future]['host'],
+                          'context': futures[future].get('context'),
+                          'result': None,
+                          'error': e,
+                          'attempts': 0,
+                          'elapsed': 0,
+                          }
+            if isinstance(entries, dict): entries= [entries]
+            
+            for entry in entries:
+                results[(entry['host'], entry['context'])]= entry
+
+                print('[{}/{}] {}{}: {} after {} attempt(s), {:0.1f} s'.format(
+                    i + 1,
+                    len(futures),
+                    entry['host'],
+                    '/' + entry['context'] if entry['context'] else '',
+                    'failed ({})'.format(entry['error']) if entry['error']
+                        else 'ok',
+                    entry['attempts'],
+                    entry['elapsed'],
+                    ))
+
+    sessions.close()
+
+    failed= [x for x in results.values() if x['error']]
+    print('Collected {} of {} contexts in {:0.1f} s, {} failed'.format(
+        len(results) - len(failed),
+        len(results),
+        time.perf_counter() - start,
+        len(failed),
+        ))
+
+    return results
+
+
+def main():
+
+    # Parse CLI arguments
+    parser= parse_args.make_parser()
+
+    parser.add_argument('-i', action="store", dest= 'inventory',
+        help= 'Inventory file of hosts and contexts to collect from')
+
+    parser.add_argument('-w', action="store", dest= 'workers', type= int,
+        default= 8, help= 'Number of firewalls to collect from at once')
+
+    parser.add_argument('--timeout', action="store", dest= 'timeout',
+        type= int, default= 60, 
+        help= 'Seconds allowed for connecting and logging in to a host')
+
+    parser.add_argument('--host-timeout', action="store", dest= 'host_timeout',
+        type= int, default= 600, 
+        help= 'Seconds allowed for each host or context as a whole,\n'
+              'including every retry')
+
+    parser.add_argument('--retries', action="store", dest= 'retries',
+        type= int, default= 2, help= 'Number of retries per host')
+
+    parser.add_argument('-s', action="store_true", dest= 'store',
+        help= 'Save each collected context to the snapshot database')
+
+    parser.add_argument('--trace', action="store", dest= 'trace',
+        help= 'Time each phase of the collection, print a summary and save\n'
+              'the spans to this file, as CSV if it ends in .csv, else JSON')
+
+    args= parser.parse_args()
+    if args.trace: instrument.enable()
+
+    with profiler.profile(args, 'collect'):
+        if args.inventory: inventory= read_inventory(args.inventory)
+        elif args.host: 
+            inventory= [{'host': args.host, 'context': args.context}]
+        else:
+            parser.print_usage()
+            sys.exit()
+
+        results= collect(inventory,
+                         username= args.username,
+                         password= args.password,
+                         workers= args.workers,
+                         timeout= args.timeout,
+                         retries= args.retries,
+                         store= args.store,
+                         host_timeout= args.host_timeout,
+                         )
+
+        for entry in results.values():
+            if entry['error']: continue
+
+            result= entry['result']
+            delta= result['delta']
+            print('{}{}: {} objects ({}), {} object groups ({})'.format(
+                entry['host'],
+                '/' + entry['context'] if entry['context'] else '',
+                len(result['objects']),
+                _format_delta(delta['objects']),
+                len(result['groups']),
+                _format_delta(delta['groups']),
+                ))
+
+        if args.trace:
+            instrument.print_summary()
+            instrument.export(args.trace)
+
+
+def _format_delta(delta):
+    return '+{} ~{} -{}'.format(
+        len(delta['added']), len(delta['modified']), len(delta['deleted']))
+
+
+if __name__ == '__main__':
+    main()
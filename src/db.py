@@ -0,0 +1,259 @@
+'''
+Created on Oct 18, 2026
+
+SQLite storage for the objects and object groups collected from firewalls.
+Every collection is saved as a snapshot of one device and context, so that
+later runs and analyses can query the stored objects instead of collecting
+and parsing them again.
+'''
+
+import os, sqlite3, gvars, objects
+
+from datetime import datetime
+
+
+_SCHEMA= '''
+    CREATE TABLE IF NOT EXISTS snapshots (
+        id          INTEGER PRIMARY KEY,
+        device      TEXT NOT NULL,
+        context     TEXT,
+        taken       TEXT NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS snapshots_device
+        ON snapshots (device, context, id);
+
+    CREATE TABLE IF NOT EXISTS objects (
+        snapshot    INTEGER NOT NULL REFERENCES snapshots (id)
+                        ON DELETE CASCADE,
+        name        TEXT NOT NULL,
+        description TEXT,
+        type        TEXT,
+        target      TEXT,
+        cidr        INTEGER,
+        hash        TEXT,
+        PRIMARY KEY (snapshot, name)
+    );
+    CREATE INDEX IF NOT EXISTS objects_target
+        ON objects (snapshot, target);
+
+    CREATE TABLE IF NOT EXISTS object_groups (
+        snapshot    INTEGER NOT NULL REFERENCES snapshots (id)
+                        ON DELETE CASCADE,
+        name        TEXT NOT NULL,
+        description TEXT,
+        hash        TEXT,
+        PRIMARY KEY (snapshot, name)
+    );
+
+    CREATE TABLE IF NOT EXISTS members (
+        snapshot    INTEGER NOT NULL REFERENCES snapshots (id)
+                        ON DELETE CASCADE,
+        group_name  TEXT NOT NULL,
+        position    INTEGER NOT NULL,
+        type        TEXT NOT NULL,
+        target      TEXT NOT NULL,
+        PRIMARY KEY (snapshot, group_name, position)
+    );
+    CREATE INDEX IF NOT EXISTS members_target
+        ON members (snapshot, target);
+'''
+
+
+def connect(path= None):
+    '''
+    Opens the snapshot database, creating it and its tables if necessary.
+
+    Optional Args:
+        path (String): The database file. Defaults to gvars.MAIN_DB_PATH.
+
+    Returns:
+        sqlite3.Connection: The open database, returning rows as
+        sqlite3.Row
+    '''
+
+    if path is None: path= gvars.MAIN_DB_PATH
+    if path != ':memory:':
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok= True)
+
+    db= sqlite3.connect(path, timeout= 30)
+    db.row_factory= sqlite3.Row
+    db.execute('PRAGMA foreign_keys = ON')
+    db.executescript(_SCHEMA)
+
+    return db
+
+
+def save_snapshot(db, device, context, objs, groups, taken= None, 
+                  hashes= None):
+    '''
+    Saves the objects and object groups collected from one device context
+    as a new snapshot, in a single transaction.
+
+    Args:
+        db (sqlite3.Connection): The database, as returned by connect
+        device (String): The host the objects were collected from
+        context (String): The context they were collected from, or None
+        objs (List of networkObject): The objects
+        groups (List of objectGroup): The object groups
+
+    Optional Args:
+        taken (datetime): When the snapshot was taken. Defaults to now.
+        hashes (Dict): {'objects', 'groups'}: Name -> hash of the block each
+            was parsed from, as returned by objects.getObjects_fromText. 
+            Saved so the next collection can be parsed incrementally.
+
+    Returns:
+        Integer: The id of the new snapshot
+    '''
+
+    if taken is None: taken= datetime.now()
+    if hashes is None: hashes= {}
+    object_hashes= hashes.get('objects') or {}
+    group_hashes= hashes.get('groups') or {}
+
+    with db:
+        snapshot= db.execute(
+            'INSERT INTO snapshots (device, context, taken) VALUES (?, ?, ?)',
+            (device, context, taken.strftime(gvars.TIME_FORMAT)),
+            ).lastrowid
+
+        db.executemany(
+            'INSERT INTO objects VALUES (?, ?, ?, ?, ?, ?, ?)',
+            ((snapshot, o.name, o.description, o.type, o.target,
+              getattr(o, 'cidr', None), object_hashes.get(o.name)) 
+             for o in objs))
+
+        db.executemany(
+            'INSERT INTO object_groups VALUES (?, ?, ?, ?)',
+            ((snapshot, g.name, g.description, group_hashes.get(g.name)) 
+             for g in groups))
+
+        db.executemany(
+            'INSERT INTO members VALUES (?, ?, ?, ?, ?)',
+            ((snapshot, g.name, i, type, target)
+             for g in groups for i, (type, target) in enumerate(g.iter_members())))
+
+    return snapshot
+
+
+def latest_snapshot(db, device, context= None):
+    '''Returns the id of the most recent snapshot of a device context, or
+    None if it has never been saved.'''
+
+    row= db.execute(
+        'SELECT id FROM snapshots WHERE device = ? AND context IS ? '
+        'ORDER BY id DESC LIMIT 1', (device, context)).fetchone()
+
+    return None if row is None else row['id']
+
+
+def latest_snapshots(db, device):
+    '''Returns the id of the most recent snapshot of every context of a 
+    device, as a dict of context -> id.'''
+
+    return {row['context']: row['id'] for row in db.execute(
+        'SELECT context, MAX(id) AS id FROM snapshots WHERE device = ? '
+        'GROUP BY context', (device,))}
+
+
+def list_snapshots(db, device= None):
+    '''Returns the snapshots of one device, or of every device, as rows of
+    (id, device, context, taken), oldest first.'''
+
+    if device is None:
+        return db.execute('SELECT * FROM snapshots ORDER BY id').fetchall()
+
+    return db.execute('SELECT * FROM snapshots WHERE device = ? ORDER BY id',
+                      (device,)).fetchall()
+
+
+def delete_snapshot(db, snapshot):
+    '''Deletes a snapshot and everything saved in it.'''
+    with db: db.execute('DELETE FROM snapshots WHERE id = ?', (snapshot,))
+
+
+def load_snapshot(db, snapshot):
+    '''
+    Rebuilds the objects and object groups saved in a snapshot.
+
+    Returns:
+        Dict:
+            'objects': List of networkObject
+            'groups': List of objectGroup
+            'registry': objectRegistry of both
+            'hashes': {'objects', 'groups'}: Name -> hash of the block each 
+                was parsed from, where known
+    '''
+
+    objs= []
+    hashes= {'objects': {}, 'groups': {}}
+    for row in db.execute(
+            'SELECT * FROM objects WHERE snapshot = ? ORDER BY rowid',
+            (snapshot,)):
+        n= objects.networkObject(name= row['name'],
+                                 description= row['description'],
+                                 type= row['type'],
+                                 target= row['target'])
+        if row['cidr'] is not None: n.cidr= row['cidr']
+        if row['hash'] is not None: hashes['objects'][n.name]= row['hash']
+        objs.append(n)
+
+    groups= {}
+    for row in db.execute(
+            'SELECT * FROM object_groups WHERE snapshot = ? ORDER BY rowid',
+            (snapshot,)):
+        groups[row['name']]= objects.objectGroup(
+            name= row['name'], description= row['description'])
+        if row['hash'] is not None: hashes['groups'][row['name']]= row['hash']
+
+    for row in db.execute(
+            'SELECT group_name, type, target FROM members WHERE snapshot = ? '
+            'ORDER BY group_name, position', (snapshot,)):
+        groups[row['group_name']].add_member(row['type'], row['target'])
+
+    groups= list(groups.values())
+
+    return {'objects': objs,
+            'groups': groups,
+            'registry': objects.objectRegistry(objs, groups),
+            'hashes': hashes,
+            }
+
+
+def find_objects(db, snapshot, target= None, type= None):
+    '''Returns the objects in a snapshot with the given target and/or type,
+    using the indexes rather than loading the snapshot.'''
+
+    query= 'SELECT * FROM objects WHERE snapshot = ?'
+    args= [snapshot]
+
+    if target is not None:
+        query+= ' AND target = ?'
+        args.append(target)
+
+    if type is not None:
+        query+= ' AND type = ?'
+        args.append(type)
+
+    return db.execute(query, args).fetchall()
+
+
+def find_referrers(db, snapshot, name):
+    '''Returns the names of the object groups in a snapshot that have the
+    object or group called `name` as a direct member.'''
+
+    return [row['group_name'] for row in db.execute(
+        'SELECT DISTINCT group_name FROM members '
+        'WHERE snapshot = ? AND target = ? AND type IN (?, ?)',
+        (snapshot, name, 'object', 'group-object'))]
+
+
+def group_members(db, snapshot, group):
+    '''Returns the direct members of an object group in a snapshot, as
+    {'type', 'target'} dicts in their configured order.'''
+
+    return [{'type': row['type'], 'target': row['target']} for row in
+            db.execute(
+                'SELECT type, target FROM members '
+                'WHERE snapshot = ? AND group_name = ? ORDER BY position',
+                (snapshot, group))]
@@ -14,6 +14,26 @@ DELAY_INCREASE = 0.3
 # The delay factor s
 BASE_DELAY = 1
 
+# Seconds that the result of a TCP port check is reused for
+PORT_CACHE_TTL = 300
+
+# Bounds, in seconds, of the adaptive timeout for reading command output
+READ_TIMEOUT_MIN = 5
+READ_TIMEOUT_MAX = 120
+
+# How many times longer than expected a read may take before it times out
+READ_TIMEOUT_SCALE = 4
+
+# Shortest output, in characters, that process_objects and 
+# process_object_groups split across worker processes
+PARALLEL_PARSE_THRESHOLD = 4 * 2**20
+
+# Set to true to record timing spans from the start (see instrument.py)
+INSTRUMENT = False
+
+# Seconds between stack samples in `--profile sample` mode
+PROFILE_INTERVAL = 0.005
+
 # Set to false to get full tracebacks
 SUPPRESS_ERRORS = True
 
@@ -23,6 +43,4 @@ RUN_PATH = current_file_dir + '/runtime/'
 MAIN_DB_PATH = RUN_PATH + 'main.db'
 DEVICE_DB_PATH = RUN_PATH + 'devices.db'
 DEVICE_PATH = RUN_PATH + 'dev/'
-
-objects= None
-object_groups= None
\ No newline at end of file
+CRED_CACHE_PATH = RUN_PATH + 'creds.json'
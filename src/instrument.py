@@ -0,0 +1,217 @@
+'''
+Created on Oct 18, 2026
+
+Lightweight timing spans and counters for the slow paths of a collection:
+connecting, enabling, switching context, reading command output and
+parsing. Disabled by default, in which case every call returns at once.
+Enable it to find out where a slow collection spent its time, then export
+the spans as JSON or CSV.
+
+    instrument.enable()
+    objects.getObjects_fromFirewall(...)
+    instrument.export('trace.json')
+'''
+
+import csv, json, threading, time, gvars
+
+from contextlib import nullcontext
+from functools import wraps
+
+
+enabled= gvars.INSTRUMENT
+
+# Finished spans, as dicts, in the order they finished
+_spans= []
+
+# Counter name -> total
+_counters= {}
+
+_lock= threading.Lock()
+
+# The stack of open spans in each thread
+_local= threading.local()
+
+# Handed out by span() while disabled
+_NULL_SPAN= nullcontext()
+
+
+def enable():
+    '''Starts recording spans and counters.'''
+    global enabled
+    enabled= True
+
+
+def disable():
+    '''Stops recording. Whatever was recorded is kept until reset.'''
+    global enabled
+    enabled= False
+
+
+def reset():
+    '''Forgets every recorded span and counter.'''
+    with _lock:
+        del _spans[:]
+        _counters.clear()
+
+
+class _span():
+    __slots__= ('name', 'tags', 'start', 'parent', 'depth')
+
+    def __init__(self, name, tags):
+        self.name= name
+        self.tags= tags
+
+    def __enter__(self):
+        stack= getattr(_local, 'stack', None)
+        if stack is None: stack= _local.stack= []
+
+        self.parent= stack[-1].name if stack else None
+        self.depth= len(stack)
+        stack.append(self)
+
+        self.start= time.perf_counter_ns()
+        return self
+
+    def __exit__(self, ty, val, tb):
+        end= time.perf_counter_ns()
+        
+        # Spans close in order, unless one was left open in a generator
+        stack= _local.stack
+        if stack[-1] is self: stack.pop()
+        else: stack.remove(self)
+
+        record= {
+            'name': self.name,
+            'parent': self.parent,
+            'depth': self.depth,
+            'thread': threading.current_thread().name,
+            'start_ns': self.start,
+            'duration_ns': end - self.start,
+            'error': None if ty is None else ty.__name__,
+            'tags': self.tags,
+            }
+
+        with _lock: _spans.append(record)
+        return False
+
+
+def span(name, **tags):
+    '''
+    Times a block of code as a span. Spans opened inside it, in the same
+    thread, are recorded as its children. Avoid holding a span open across
+    a yield, since the consumer's spans would be recorded as its children;
+    use counters in generators instead.
+
+        with instrument.span('cli.enable', host= host):
+            connection.enable()
+
+    Args:
+        name (String): The name of the span, as `module.phase`
+
+    Optional Args:
+        tags: Anything else to record with the span, such as the host
+
+    Returns:
+        A context manager. While disabled, a shared one that does nothing.
+    '''
+
+    if not enabled: return _NULL_SPAN
+    return _span(name, tags)
+
+
+def timed(name= None):
+    '''Decorates a function so that every call to it is a span, named
+    after the function unless a name is given.'''
+
+    def decorate(func):
+        span_name= name or '{}.{}'.format(func.__module__, func.__name__)
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not enabled: return func(*args, **kwargs)
+            with _span(span_name, {}): return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorate
+
+
+def count(name, value= 1):
+    '''Adds `value` to the counter called `name`.'''
+
+    if not enabled: return
+    with _lock: _counters[name]= _counters.get(name, 0) + value
+
+
+def spans():
+    '''Returns a copy of the recorded spans.'''
+    with _lock: return list(_spans)
+
+
+def counters():
+    '''Returns a copy of the counters.'''
+    with _lock: return dict(_counters)
+
+
+def summary():
+    '''
+    Totals the recorded spans by name.
+
+    Returns:
+        Dict: Span name -> {'count', 'total_ms', 'max_ms', 'errors'}
+    '''
+
+    totals= {}
+    for x in spans():
+        t= totals.setdefault(x['name'],
+            {'count': 0, 'total_ms': 0.0, 'max_ms': 0.0, 'errors': 0})
+        ms= x['duration_ns'] / 1e6
+        t['count']+= 1
+        t['total_ms']+= ms
+        t['max_ms']= max(t['max_ms'], ms)
+        if x['error']: t['errors']+= 1
+
+    return totals
+
+
+def print_summary():
+    '''Prints the totals from summary, slowest first, and the counters.'''
+
+    totals= summary()
+    for name in sorted(totals, key= lambda x: -totals[x]['total_ms']):
+        t= totals[name]
+        print('{:40} {:6} calls {:12.1f} ms total {:10.1f} ms max'.format(
+            name, t['count'], t['total_ms'], t['max_ms']))
+
+    for name, value in sorted(counters().items()):
+        print('{:40} {}'.format(name, value))
+
+
+def export(path):
+    '''
+    Saves the recorded spans and counters for analysis. A path ending in
+    `.csv` gets one row per span, with the counters as rows named
+    `counter:<name>`. Anything else gets JSON:
+    {'spans': [...], 'counters': {...}}.
+    '''
+
+    if path.lower().endswith('.csv'):
+        fields= ['name', 'parent', 'depth', 'thread', 'start_ns',
+                 'duration_ns', 'error', 'tags']
+
+        with open(path, 'w', newline= '') as outfile:
+            writer= csv.DictWriter(outfile, fieldnames= fields)
+            writer.writeheader()
+
+            for x in spans():
+                writer.writerow(
+                    dict(x, tags= json.dumps(x['tags'], default= str)))
+
+            for name, value in sorted(counters().items()):
+                writer.writerow({'name': 'counter:' + name,
+                                 'duration_ns': value})
+        return
+
+    with open(path, 'w') as outfile:
+        json.dump({'spans': spans(), 'counters': counters()}, outfile,
+                  indent= 1, default= str)
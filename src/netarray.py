@@ -0,0 +1,268 @@
+'''
+Created on Oct 18, 2026
+
+Bulk IPv4 math over NumPy arrays. The functions in util work on one
+address string at a time; these convert whole columns of addresses and
+netmasks into uint32 arrays once, after which validation, CIDR conversion,
+network addresses and containment tests run over every entry at once.
+'''
+
+import numpy as np
+
+
+# The longest dotted quad, 255.255.255.255
+_MAX_LENGTH= 15
+
+_DOT= ord('.')
+_ZERO= ord('0')
+
+
+def parse(strings):
+    '''
+    Packs a column of dotted quad IPv4 addresses or netmasks into a uint32
+    array, without raising on bad entries.
+
+    Args:
+        strings (Iterable of String): The addresses
+
+    Returns:
+        Tuple:
+            numpy.ndarray of uint32: The packed addresses. Entries that are
+                not IPv4 addresses are 0.
+            numpy.ndarray of bool: True where the entry is an IPv4 address
+    '''
+
+    # One row of bytes per string, padded with nulls. One byte longer than
+    # a dotted quad, so that anything longer can be spotted and rejected.
+    width= 'S{}'.format(_MAX_LENGTH + 1)
+    if not isinstance(strings, np.ndarray): strings= list(strings)
+    try: raw= np.array(strings, dtype= width)
+    except UnicodeEncodeError:
+        # Non-ASCII text is never an address, so replacing it is harmless
+        raw= np.char.encode(np.asarray(strings, dtype= str), 'ascii',
+                            'replace').astype(width)
+    chars= raw.view(np.uint8).reshape(len(raw), _MAX_LENGTH + 1)
+
+    count= len(raw)
+    packed= np.zeros(count, dtype= np.uint32)
+    octet= np.zeros(count, dtype= np.uint32)
+    digits= np.zeros(count, dtype= np.uint8)
+    dots= np.zeros(count, dtype= np.uint8)
+    ended= np.zeros(count, dtype= bool)
+    valid= chars[:, _MAX_LENGTH] == 0
+
+    # Walk the columns, one character of every string at a time
+    for i in range(_MAX_LENGTH + 1):
+        c= chars[:, i]
+        is_digit= (c >= _ZERO) & (c <= _ZERO + 9) & ~ended
+        is_dot= (c == _DOT) & ~ended
+        is_end= (c == 0) & ~ended
+
+        # Anything else is not part of an address
+        valid&= is_digit | is_dot | is_end | ended
+
+        octet= np.where(is_digit, octet * 10 + (c - _ZERO), octet)
+        digits+= is_digit
+
+        # A dot or the end of the string closes an octet
+        closed= is_dot | is_end
+        valid&= ~closed | ((digits >= 1) & (digits <= 3) & (octet <= 255))
+        packed= np.where(closed, packed << 8 | octet, packed)
+        octet[closed]= 0
+        digits[closed]= 0
+
+        dots+= is_dot
+        ended|= is_end
+
+    valid&= ended & (dots == 3)
+    packed[~valid]= 0
+
+    return packed, valid
+
+
+def pack(strings):
+    '''
+    Packs a column of dotted quad IPv4 addresses or netmasks into a uint32
+    array.
+
+    Args:
+        strings (Iterable of String): The addresses
+
+    Returns:
+        numpy.ndarray of uint32: The packed addresses
+
+    Raises:
+        ValueError: If any entry is not an IPv4 address
+    '''
+
+    if not isinstance(strings, np.ndarray): strings= list(strings)
+    packed, valid= parse(strings)
+
+    if not valid.all():
+        bad= np.flatnonzero(~valid)
+        raise ValueError('{} entries are not IPv4 addresses, starting with '
+            '[{}]'.format(len(bad), strings[bad[0]]))
+
+    return packed
+
+
+def unpack(packed):
+    '''Unpacks a uint32 array into a list of dotted quad strings.'''
+
+    packed= np.asarray(packed, dtype= np.uint32)
+    octets= packed[:, None] >> np.array([24, 16, 8, 0], dtype= np.uint32) & 255
+
+    return ['{}.{}.{}.{}'.format(*x) for x in octets.tolist()]
+
+
+def is_ip(strings):
+    '''Returns a bool array, True where the entry is an IPv4 address.'''
+    return parse(strings)[1]
+
+
+def is_netmask(masks):
+    '''Returns a bool array, True where the packed netmask is contiguous
+    (a run of ones followed by zeros).'''
+
+    inverted= ~np.asarray(masks, dtype= np.uint32)
+    return (inverted & (inverted + np.uint32(1))) == 0
+
+
+def netmask_to_cidr(masks):
+    '''Returns the prefix length of each packed netmask, as a uint8 array.
+    Netmasks are not checked for contiguity; see is_netmask.'''
+
+    masks= np.asarray(masks, dtype= np.uint32)
+    if hasattr(np, 'bitwise_count'):
+        return np.bitwise_count(masks).astype(np.uint8)
+
+    # Count the set bits in parallel, for NumPy < 2.0
+    masks= masks - (masks >> 1 & 0x55555555)
+    masks= (masks & 0x33333333) + (masks >> 2 & 0x33333333)
+    masks= (masks + (masks >> 4)) & 0x0f0f0f0f
+    return (masks * np.uint32(0x01010101) >> 24).astype(np.uint8)
+
+
+def cidr_to_netmask(cidrs):
+    '''
+    Returns the packed netmask of each prefix length, as a uint32 array.
+
+    Raises:
+        ValueError: If any prefix length is outside 0 - 32
+    '''
+
+    cidrs= np.asarray(cidrs, dtype= np.int64)
+    if ((cidrs < 0) | (cidrs > 32)).any():
+        raise ValueError('Input CIDR not recognized as a valid netmask')
+
+    return (0xffffffff << (32 - cidrs) & 0xffffffff).astype(np.uint32)
+
+
+def network_address(addresses, masks):
+    '''Returns the network address of each packed address and netmask.'''
+    return np.asarray(addresses, dtype= np.uint32) & \
+           np.asarray(masks, dtype= np.uint32)
+
+
+def broadcast_address(addresses, masks):
+    '''Returns the broadcast address of each packed address and netmask.'''
+    return np.asarray(addresses, dtype= np.uint32) | \
+           ~np.asarray(masks, dtype= np.uint32)
+
+
+def contains(networks, masks, addresses):
+    '''
+    Tests whether addresses fall within networks. The arguments broadcast
+    against each other like any NumPy operation, so one network can be
+    tested against many addresses, or the networks can be given as a
+    column (`networks[:, None]`) to test every address against every
+    network.
+
+    Args:
+        networks (numpy.ndarray of uint32): Packed network addresses
+        masks (numpy.ndarray of uint32): Packed netmasks of the networks
+        addresses (numpy.ndarray of uint32): Packed addresses to test
+
+    Returns:
+        numpy.ndarray of bool: True where the address is in the network
+    '''
+
+    masks= np.asarray(masks, dtype= np.uint32)
+    return (np.asarray(addresses, dtype= np.uint32) & masks) == \
+           (np.asarray(networks, dtype= np.uint32) & masks)
+
+
+def object_columns(objs):
+    '''
+    Converts network objects into columns. Only `host` and `subnet`
+    objects with a packed address are included.
+
+    Args:
+        objs (Iterable of networkObject): The objects
+
+    Returns:
+        Dict:
+            'name': List of String: The name of each object
+            'address': numpy.ndarray of uint32: Its packed address
+            'mask': numpy.ndarray of uint32: Its packed netmask
+    '''
+
+    names= []
+    addresses= []
+    cidrs= []
+    for o in objs:
+        address= o.address()
+        if address is None or o.cidr is None: continue
+
+        names.append(o.name)
+        addresses.append(address)
+        cidrs.append(o.cidr)
+
+    return {'name': names,
+            'address': np.array(addresses, dtype= np.uint32),
+            'mask': cidr_to_netmask(cidrs),
+            }
+
+
+def member_columns(groups):
+    '''
+    Converts the `network` and `host` members of object groups into
+    columns. The members are taken from objectGroup.address_members,
+    without building the member dicts.
+
+    Args:
+        groups (Iterable of objectGroup): The object groups
+
+    Returns:
+        Dict:
+            'group': List of String: The name of each group, in order
+            'index': numpy.ndarray of uint32: For each member, the position
+                of its group in 'group'
+            'address': numpy.ndarray of uint32: Its packed address
+            'mask': numpy.ndarray of uint32: Its packed netmask
+    '''
+
+    names= []
+    addresses= []
+    masks= []
+    index= []
+
+    for i, g in enumerate(groups):
+        names.append(g.name)
+        address, mask= g.address_members()
+        if not len(address): continue
+
+        addresses.append(np.frombuffer(address, dtype= np.uint32))
+        masks.append(np.frombuffer(mask, dtype= np.uint32))
+        index.append(np.full(len(address), i, dtype= np.uint32))
+
+    if not addresses:
+        empty= np.zeros(0, dtype= np.uint32)
+        return {'group': names, 'index': empty,
+                'address': empty, 'mask': empty}
+
+    return {'group': names,
+            'index': np.concatenate(index),
+            'address': np.concatenate(addresses),
+            'mask': np.concatenate(masks),
+            }
@@ -0,0 +1,216 @@
+'''
+Created on Oct 18, 2026
+
+Answers "what covers this address?" and "what overlaps this network?" for
+the objects and object groups of a firewall, without walking every object.
+'''
+
+import sys, bisect, parse_args, util, collect, profiler
+
+
+def parse_network(text):
+    '''
+    Converts an address, network or range into the first and last packed
+    IPv4 addresses it covers. Accepts `10.1.2.3`, `10.0.0.0/8`,
+    `10.0.0.0 255.0.0.0` and `10.0.0.1-10.0.0.9`.
+
+    Returns:
+        Tuple: (start, end)
+
+    Raises:
+        ValueError: If the text is not in one of those forms
+    '''
+
+    text= text.strip()
+
+    if '-' in text:
+        start, end= (util.ip_to_int(x.strip()) for x in text.split('-', 1))
+        if start > end:
+            raise ValueError('[{}] ends before it starts'.format(text))
+        return (start, end)
+
+    if '/' in text: address, _, cidr= text.partition('/')
+    elif ' ' in text:
+        address, _, netmask= text.partition(' ')
+        cidr= util.netmask_to_cidr(netmask.strip())
+    else: address, cidr= text, 32
+
+    try: cidr= int(cidr)
+    except ValueError: cidr= -1
+    if not (0 <= cidr <= 32):
+        raise ValueError('[{}] is not a valid network'.format(text))
+
+    size= 1 << (32 - cidr)
+    start= util.ip_to_int(address.strip()) & -size
+    return (start, start + size - 1)
+
+
+class networkIndex():
+    '''An index of named address intervals, for point and range queries.
+
+    Every interval is split into CIDR blocks, and the blocks are kept in
+    one sorted array per prefix length. A query makes one binary search
+    per prefix length, so it takes O(log n) time however many intervals
+    are indexed, plus the time to list what it finds.
+    '''
+
+    def __init__(self):
+        # Entry id -> (type, name)
+        self.entries= []
+
+        # (prefix length, network, entry id) of every block, until sorted
+        self._pending= []
+
+        # Prefix length -> sorted networks, and the entry id of each
+        self._networks= [[] for x in range(33)]
+        self._ids= [[] for x in range(33)]
+
+    def __len__(self):
+        return len(self.entries)
+
+    def add(self, type, name, intervals):
+        '''Adds an object or group to the index.
+
+        Args:
+            type (String): 'object' or 'object-group'
+            name (String): Its name
+            intervals (List of Tuples): The (start, end) packed addresses
+                it covers
+        '''
+
+        entry= len(self.entries)
+        self.entries.append((type, name))
+
+        for start, end in intervals:
+            for network, prefix in util.interval_prefixes(start, end):
+                self._pending.append((prefix, network, entry))
+
+    def _sort(self):
+        if not self._pending: return
+
+        for prefix, network, entry in self._pending:
+            self._networks[prefix].append(network)
+            self._ids[prefix].append(entry)
+
+        self._pending= []
+        for prefix in range(33):
+            if not self._networks[prefix]: continue
+
+            pairs= sorted(zip(self._networks[prefix], self._ids[prefix]))
+            self._networks[prefix]= [x[0] for x in pairs]
+            self._ids[prefix]= [x[1] for x in pairs]
+
+    def covering(self, address):
+        '''
+        Finds the objects and groups covering an address.
+
+        Args:
+            address (Integer or String): A packed or dotted quad address
+
+        Returns:
+            List of Tuples: (type, name), most specific first
+        '''
+
+        if isinstance(address, str): address= util.ip_to_int(address)
+        return self.overlapping(address, address)
+
+    def overlapping(self, start, end= None):
+        '''
+        Finds the objects and groups covering any address in an interval.
+
+        Args:
+            start (Integer or String): The first packed address, or any
+                network accepted by parse_network
+
+        Optional Args:
+            end (Integer): The last packed address. Defaults to `start`.
+
+        Returns:
+            List of Tuples: (type, name), most specific first
+        '''
+
+        if isinstance(start, str): start, end= parse_network(start)
+        if end is None: end= start
+
+        self._sort()
+
+        found= []
+        seen= set()
+        for prefix in range(32, -1, -1):
+            networks= self._networks[prefix]
+            if not networks: continue
+
+            # The first block that could reach start
+            i= bisect.bisect_left(networks, start & -(1 << (32 - prefix)))
+            ids= self._ids[prefix]
+
+            while i < len(networks) and networks[i] <= end:
+                if ids[i] not in seen:
+                    seen.add(ids[i])
+                    found.append(self.entries[ids[i]])
+                i+= 1
+
+        return found
+
+
+def build_index(registry):
+    '''Indexes the host, subnet and range objects and the expanded object
+    groups of an objectRegistry, and returns the networkIndex.'''
+
+    index= networkIndex()
+
+    for name, obj in registry.objects.items():
+        interval= obj.interval()
+        if interval is not None: index.add('object', name, [interval])
+
+    for name, intervals in registry.resolve_expansions().items():
+        if intervals: index.add('object-group', name, intervals)
+
+    return index
+
+
+def main():
+
+    # Parse CLI arguments
+    parser= parse_args.make_parser()
+
+    parser.add_argument('-d', action="store_true", dest= 'database',
+        help= 'Use the latest snapshot of the host from the database\n'
+              'instead of connecting to it')
+
+    commands= parser.add_subparsers(dest= 'command')
+    covers= commands.add_parser('covers',
+        help= 'List the objects and groups covering an address')
+    covers.add_argument('address', help= 'An address, such as 10.1.2.3')
+
+    overlaps= commands.add_parser('overlaps',
+        help= 'List the objects and groups overlapping a network')
+    overlaps.add_argument('network',
+        help= 'A network, such as 10.0.0.0/8 or 10.0.0.1-10.0.0.9')
+
+    args= parser.parse_args()
+    if args.command is None:
+        parser.print_usage()
+        sys.exit()
+
+    with profiler.profile(args, 'netindex'):
+        try: 
+            registry= collect.load(host= args.host,
+                                   context= args.context,
+                                   username= args.username,
+                                   password= args.password,
+                                   database= args.database,
+                                   )['registry']
+        except ValueError as e: sys.exit(e)
+
+        index= build_index(registry)
+
+        if args.command == 'covers': found= index.covering(args.address)
+        else: found= index.overlapping(args.network)
+
+        for type, name in found: print('{} {}'.format(type, name))
+        if not found: print('Nothing found')
+
+
+if __name__ == '__main__':
+    main()
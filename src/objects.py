@@ -4,11 +4,14 @@ Created on Mar 24, 2017
 @author: Wyko
 '''
 
-import argparse, textwrap, re, cli, util
+import textwrap, re, io, os, hashlib, threading, cli, util, gvars, \
+       instrument, parse_args, profiler
 
+from array import array
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 from netmiko import ConnectHandler
-from time import sleep
+from time import sleep, monotonic
 import prettytable
 
 
@@ -31,13 +34,11 @@ def cidr_to_netmask(cidr):
  
     
 def parse_cli():
-    parser = argparse.ArgumentParser(
-        prog= 'FireCheck',
-        formatter_class= argparse.RawTextHelpFormatter,
-        description=textwrap.dedent(
+    parser= parse_args.make_parser()
+    parser.description= textwrap.dedent(
             '''\
             Various tools for interacting with a Cisco ASA firewall
-            '''))
+            ''')
 
     parser.add_argument(
         '-m',
@@ -46,59 +47,113 @@ def parse_cli():
         help= 'Print the members of each group',
         )
     
-    parser.add_argument(
-        '-h',
-        action="store",
-        dest= 'host',
-        help= 'Network address of the firewall',
-        )
-    
-    parser.add_argument(
-        '-c',
-        action="store",
-        dest= 'context',
-        help= 'Change to the specified context',
-        default= None,
-        )
-
-    #===========================================================================
-    # parser.add_argument(
-    #     '-p',
-    #     action="store_true",
-    #     dest= 'print',
-    #     help= 'Print',
-    #     )
-    #===========================================================================
-    
     parser.add_argument(
         '-w',
         action="store_true",
         dest= 'wait',
-        help= 'Wait after printing each entry (if -p)',
-        )
-     
-    parser.add_argument(
-        '-u',
-        action="store",
-        dest= 'user',
-        help= 'Username',
-        )
-     
-    parser.add_argument(
-        '-p',
-        action="store",
-        dest= 'password',
-        help= 'Password',
+        help= 'Wait after printing each entry',
         )
      
     return parser.parse_args()
 
 
+# Member types. A member's type code is the index of its type in this list.
+# The list is fixed, so codes mean the same thing in every process.
+_MEMBER_TYPES= ('object', 'group-object', 'network', 'host')
+_MEMBER_CODES= {x: i for i, x in enumerate(_MEMBER_TYPES)}
+_OBJECT, _GROUP_OBJECT, _NETWORK, _HOST= range(4)
+
+# Set on a member's type code when its target is a symbol id rather than a 
+# packed IPv4 address
+_SYMBOLIC= 0x80
+
+# Interned member target names, shared by every object group. A name's 
+# symbol id is its index in _symbols.
+_symbols= []
+_symbol_ids= {}
+_symbol_lock= threading.Lock()
+
+
+def _intern(name):
+    '''Returns the symbol id of a member target name, adding it to the 
+    symbol table if it is new.'''
+    
+    symbol= _symbol_ids.get(name)
+    if symbol is not None: return symbol
+    else:
+        with _symbol_lock:
+            if name not in _symbol_ids:
+                _symbol_ids[name]= len(_symbols)
+                _symbols.append(name)
+            return _symbol_ids[name]
+
+
+def _intern_many(names):
+    '''Returns the symbol ids of many member target names at once, taking
+    the lock only once for all the new ones.'''
+    
+    ids= [_symbol_ids.get(x) for x in names]
+    if None in ids:
+        with _symbol_lock:
+            for i, name in enumerate(names):
+                if ids[i] is not None: continue
+                if name not in _symbol_ids:
+                    _symbol_ids[name]= len(_symbols)
+                    _symbols.append(name)
+                ids[i]= _symbol_ids[name]
+    
+    return ids
+
+
+def _member_code(type):
+    '''Returns the type code of a member type.
+    
+    Raises:
+        ValueError: If the type is not one of _MEMBER_TYPES
+    '''
+    
+    try: return _MEMBER_CODES[type]
+    except KeyError:
+        raise ValueError('Unknown member type [{}]'.format(type)) from None
+
+
 class objectGroup():
+    '''A `object-group network` and its members. 
+    
+    The members are held in three parallel arrays rather than as a list of 
+    dicts: a one byte type code, a 32 bit target and a 32 bit netmask. 
+    `network` and `host` targets are stored as packed IPv4 addresses, and 
+    every other target as the id of its interned name. The `members` 
+    property rebuilds the {'type', 'target'} dicts on demand.
+    '''
+    
+    __slots__= ('name', 'description', '_codes', '_targets', '_masks', 
+                '_registry')
+    
     def __init__(self, **kwargs):
         self.name= kwargs.get('name')
         self.description= kwargs.get('description')
-        self.members= kwargs.get('members', [])
+        
+        self._codes= array('B')
+        self._targets= array('I')
+        self._masks= array('I')
+        for m in kwargs.get('members', []): 
+            self._append(m['type'], m['target'])
+        
+        # The objectRegistry that member references are resolved against.
+        # Set by objectRegistry.add_group.
+        self._registry= kwargs.get('registry')
+    
+    def __getstate__(self):
+        # Symbol ids are only valid in this process, so pickle the names
+        return {'name': self.name, 
+                'description': self.description,
+                'members': list(self.iter_members()),
+                }
+    
+    def __setstate__(self, state):
+        self.__init__(name= state['name'], description= state['description'])
+        for type, target in state['members']: self._append(type, target)
         
     def __str__(self):
         pt= prettytable.PrettyTable(['Name', self.name])
@@ -107,289 +162,1432 @@ class objectGroup():
         for item in dir(self):
             if item == 'members':
                 pt.add_row(['Members', ''])
-                for m in self.members:
-                    pt.add_row(['', m['type'] + ': ' + m['target']])
+                for type, target in self.iter_members():
+                    pt.add_row(['', type + ': ' + target])
             
-            elif not item.startswith("_") and 'name' not in item: 
+            elif (not item.startswith("_") and 'name' not in item and
+                  not callable(getattr(self, item))): 
                 pt.add_row([item.title(), getattr(self, item)])
                 
         return str(pt)
+    
+    @property
+    def members(self):
+        '''The members of the group as a tuple of {'type', 'target'} dicts.
+        Use add_member and remove_member to change them.'''
+        return tuple({'type': type, 'target': target} 
+                     for type, target in self.iter_members())
         
     @property
     def weight(self):
-        total= 0
-        if len(self.members) == 0: return 0
+        '''The total weight of every member of the group, with nested 
+        object groups resolved through the registry.'''
+        
+        if len(self._codes) == 0: return 0
+        
+        if self._registry is None:
+            raise ValueError('Object group [{}] is not attached to an '
+                'objectRegistry'.format(self.name))
+        
+        return self._registry.group_weight(self.name)
+    
+    def expand(self):
+        '''Returns the addresses covered by the group, with nested object 
+        groups resolved through the registry. See objectRegistry.expand.'''
+        
+        if len(self._codes) == 0: return ()
+        
+        if self._registry is None:
+            raise ValueError('Object group [{}] is not attached to an '
+                'objectRegistry'.format(self.name))
+        
+        return self._registry.expand(self.name)
+    
+    def iter_members(self):
+        '''Yields the type and target of each member, in order.'''
+        for i in range(len(self._codes)): yield self.member(i)
+    
+    def address_members(self):
+        '''Returns the `network` and `host` members of the group, in order,
+        as two parallel array('I') of packed addresses and packed netmasks,
+        without decoding them.'''
+        
+        addresses= array('I')
+        masks= array('I')
+        for code, target, mask in zip(self._codes, self._targets, self._masks):
+            if code in (_NETWORK, _HOST):
+                addresses.append(target)
+                masks.append(mask)
+        
+        return addresses, masks
+    
+    def references(self, types= ('object', 'group-object')):
+        '''Returns the target names of the members of the given types.'''
+        
+        wanted= {_MEMBER_CODES[x] | _SYMBOLIC for x in types 
+                 if x in _MEMBER_CODES}
+        return [_symbols[target] for code, target in 
+                zip(self._codes, self._targets) if code in wanted]
+    
+    def add_member(self, type, target):
+        '''Adds a member to the group, and invalidates any cached weights
+        depending on this group.
+        
+        Raises:
+            ValueError: If the type is not one of _MEMBER_TYPES
+        '''
+        
+        self._append(type, target)
+        if self._registry is not None: self._registry.add_group(self)
+    
+    def remove_member(self, type, target):
+        '''Removes a member from the group.
+        
+        Raises:
+            ValueError: If the group has no such member
+        '''
+        
+        for i in range(len(self._codes)):
+            if self.member(i) == (type, target): break
+        else:
+            raise ValueError('Object group [{}] has no member [{}: {}]'.format(
+                self.name, type, target))
+        
+        del self._codes[i]
+        del self._targets[i]
+        del self._masks[i]
+        if self._registry is not None: self._registry.add_group(self)
+    
+    def _append(self, type, target):
+        code= _member_code(type)
+        
+        try:
+            if code == _NETWORK:
+                address, mask= target.split(' / ')
+                packed= (util.ip_to_int(address), util.ip_to_int(mask))
+            elif code == _HOST:
+                packed= (util.ip_to_int(target), 0xffffffff)
+            else:
+                packed= None
+        except ValueError:
+            packed= None
+        
+        if packed is None:
+            code|= _SYMBOLIC
+            packed= (_intern(target), 0)
+        
+        self._codes.append(code)
+        self._targets.append(packed[0])
+        self._masks.append(packed[1])
+    
+    def _append_network(self, address, mask):
+        '''Faster _append for the address/mask members of the parser, 
+        which have already been matched as dotted quads.'''
+        
+        try: 
+            packed= (int.from_bytes(bytes(map(int, address.split('.'))), 'big'),
+                     int.from_bytes(bytes(map(int, mask.split('.'))), 'big'))
+        except ValueError: 
+            self._append('network', address + ' / ' + mask)
+            return
+        
+        self._codes.append(_NETWORK)
+        self._targets.append(packed[0])
+        self._masks.append(packed[1])
+    
+    def _append_symbol(self, code, name):
+        '''Faster _append for members whose target is always a name'''
+        
+        self._codes.append(code | _SYMBOLIC)
+        self._targets.append(_intern(name))
+        self._masks.append(0)
+    
+    def member(self, i):
+        '''Returns the type and target of the member at position `i`.'''
+        
+        code= self._codes[i]
+        type= _MEMBER_TYPES[code & ~_SYMBOLIC]
+        
+        if code & _SYMBOLIC: 
+            return type, _symbols[self._targets[i]]
+        
+        if code == _NETWORK:
+            return type, '{} / {}'.format(util.int_to_ip(self._targets[i]), 
+                                          util.int_to_ip(self._masks[i]))
+        
+        return type, util.int_to_ip(self._targets[i])
+        
+
+class objectRegistry():
+    '''Name indexed collection of the network objects and object groups 
+    parsed from a single firewall context. Object groups resolve their 
+    `object` and `group-object` member references against it, so each 
+    lookup is a single dict access rather than a scan of every object.
+    
+    Group weights and expansions are memoized. They are computed once per 
+    group, in topological order, and are invalidated along with those of 
+    every group that (directly or indirectly) references a changed object 
+    or group.
+    
+    The registry also keeps a reverse index of who references each object 
+    and group, updated as groups are added, so finding the referrers of a 
+    name never scans the groups.
+    
+    Args:
+        objects (list of networkObject): Objects to index
+        groups (list of objectGroup): Object groups to index
+    '''
+    
+    def __init__(self, objects= None, groups= None):
+        self.objects= {}
+        self.groups= {}
+        
+        # Group name -> memoized weight
+        self._weights= {}
+        
+        # Group name -> memoized expansion, a tuple of (start, end)
+        self._expansions= {}
+        
+        # Object or group name -> set of names of the groups referencing it
+        self._referrers= {}
+        
+        # Group name -> set of the object and group names it references
+        self._references= {}
+        
+        # Object or group name -> set of (type, name) of anything else 
+        # referencing it, such as access-lists, added with add_reference
+        self._external= {}
+        
+        for o in objects or []: self.add_object(o)
+        for g in groups or []: self.add_group(g)
+    
+    def __len__(self):
+        return len(self.objects) + len(self.groups)
+    
+    def add_object(self, obj):
+        '''Adds a networkObject to the registry, replacing any existing 
+        object with the same name.'''
+        self.objects[obj.name]= obj
+        self.invalidate(obj.name)
+        
+    def add_group(self, group):
+        '''Adds an objectGroup to the registry, replacing any existing 
+        group with the same name, and attaches the group to the registry. 
+        Calling this again for a group that was modified in place refreshes 
+        its references.'''
+        
+        # Forget the references held by the previous version of the group
+        for name in self._references.pop(group.name, ()):
+            self._referrers[name].discard(group.name)
+        
+        group._registry= self
+        self.groups[group.name]= group
+        
+        references= set(group.references())
+        self._references[group.name]= references
+        for name in references:
+            self._referrers.setdefault(name, set()).add(group.name)
+        
+        self.invalidate(group.name)
+    
+    def add_reference(self, type, source, name):
+        '''Records that something other than an object group, such as an 
+        access-list or NAT rule, references the object or group `name`.
         
-        for x in self.members:
-            if x['type']== 'object': 
-                total+= self._object_weight(x['target'])
+        Args:
+            type (String): The kind of referrer, such as 'access-list'
+            source (String): The name of the referrer
+            name (String): The object or group it references
+        '''
+        self._external.setdefault(name, set()).add((type, source))
+    
+    def referrers(self, name):
+        '''Returns everything directly referencing the object or group 
+        called `name`, as a sorted list of (type, name) tuples.'''
+        
+        return sorted([('object-group', x) for x in 
+                       self._referrers.get(name, ())] + 
+                      list(self._external.get(name, ())))
+    
+    def fan_in(self):
+        '''Returns the number of direct referrers of every object and 
+        group, as a dict of name -> count. Unreferenced names count 0.'''
+        
+        counts= dict.fromkeys(self.objects, 0)
+        counts.update(dict.fromkeys(self.groups, 0))
+        
+        for index in (self._referrers, self._external):
+            for name, referrers in index.items():
+                if name in counts: counts[name]+= len(referrers)
+        
+        return counts
+    
+    def get_object(self, name, referrer= None):
+        '''Returns the networkObject called `name`.
+        
+        Optional Args:
+            referrer (String): The name of the object group holding the 
+                reference. Only used in the error message.
+        
+        Raises:
+            ValueError: If the object is not in the registry
+        '''
+        try: return self.objects[name]
+        except KeyError:
+            raise ValueError('Object [{}] referenced in object group [{}] but '
+                'not found in objects'.format(name, referrer))
+    
+    def get_group(self, name, referrer= None):
+        '''Returns the objectGroup called `name`.
+        
+        Optional Args:
+            referrer (String): The name of the object group holding the 
+                reference. Only used in the error message.
+        
+        Raises:
+            ValueError: If the object group is not in the registry
+        '''
+        try: return self.groups[name]
+        except KeyError:
+            raise ValueError('Object-group [{}] referenced in object group [{}] '
+                'but not found in object groups'.format(name, referrer))
+
+    
+    def invalidate(self, name):
+        '''Drops the memoized weight and expansion of the object or group 
+        called `name` and of every group that references it, directly or 
+        indirectly.'''
+        
+        self._weights.pop(name, None)
+        self._expansions.pop(name, None)
+        pending= list(self._referrers.get(name, ()))
+        
+        while pending:
+            # A group is only ever memoized after everything it references, 
+            # so there is nothing to invalidate above an unmemoized group
+            n= pending.pop()
+            weight= self._weights.pop(n, None)
+            expansion= self._expansions.pop(n, None)
+            if weight is None and expansion is None: continue
+            
+            pending.extend(self._referrers.get(n, ()))
+    
+    def group_weight(self, name):
+        '''Returns the weight of the object group called `name`, computing 
+        it (and any uncached nested groups) if necessary.
+        
+        Raises:
+            ValueError: If a referenced object or group does not exist, or 
+                if the group references itself through a cycle
+        '''
+        
+        if name not in self._weights: self.resolve_weights([name])
+        return self._weights[name]
+    
+    def resolve_weights(self, names= None):
+        '''Computes and memoizes the weights of the named object groups 
+        and everything they contain. Each group is computed only once, after
+        all of the groups it references.
+        
+        Optional Args:
+            names (list of String): The groups to resolve. Defaults to every
+                group in the registry.
+        
+        Returns:
+            Dict: Group name -> weight, for every group resolved so far
+        
+        Raises:
+            ValueError: If a referenced object or group does not exist, or 
+                if a cyclic group-object reference is found
+        '''
+        
+        for name in self.topological_order(names):
+            group= self.groups[name]
+            total= 0
             
-            elif x['type']== 'group-object': 
-                total+= self._object_group_weight(x['target'])
+            for code, target in zip(group._codes, group._targets):
+                type= code & ~_SYMBOLIC
+                
+                if type == _OBJECT: 
+                    total+= self.get_object(
+                        _symbols[target], referrer= group.name).weight
+                
+                elif type == _GROUP_OBJECT: 
+                    total+= self._weights[_symbols[target]]
+                
+                elif type in (_NETWORK, _HOST): 
+                    total+= 1
+                
+                else:
+                    raise TypeError(
+                        'Unknown object type: [{}]'.format(_MEMBER_TYPES[type]))
             
-            elif x['type']== 'network': 
-                total+= 1
+            self._weights[name]= total
+        
+        return self._weights
+    
+    def expand(self, name):
+        '''Returns the addresses covered by the object group called `name`
+        as a tuple of (start, end) packed IPv4 intervals, merged and in 
+        order, expanding it (and any unexpanded nested groups) if necessary.
+        
+        Raises:
+            ValueError: If a referenced object or group does not exist, or 
+                if the group references itself through a cycle
+        '''
+        
+        if name not in self._expansions: self.resolve_expansions([name])
+        return self._expansions[name]
+    
+    def resolve_expansions(self, names= None):
+        '''Expands the named object groups, and every group nested in them,
+        into the address intervals they cover, and memoizes the results. 
+        `object`, `network` and `host` members are converted to intervals,
+        and `group-object` members reuse the memoized expansion of the 
+        nested group, so a group shared by many others is expanded once. 
+        Members that are not IPv4 addresses, such as fqdn objects, cover 
+        nothing.
+        
+        Optional Args:
+            names (list of String): The groups to expand. Defaults to every
+                group in the registry.
+        
+        Returns:
+            Dict: Group name -> expansion, for every group expanded so far
+        
+        Raises:
+            ValueError: If a referenced object or group does not exist, or 
+                if a cyclic group-object reference is found
+        '''
+        
+        for name in self.topological_order(names, done= self._expansions):
+            intervals= []
             
+            # A member listed twice adds nothing the second time
+            for position, first, covered in self.member_intervals(
+                    self.groups[name]):
+                if position == first: intervals.extend(covered)
             
-            else:
-                raise TypeError('Unknown object type: [{}]'.format(x['type']))
+            self._expansions[name]= tuple(util.merge_intervals(intervals))
+        
+        return self._expansions
+    
+    def member_intervals(self, group):
+        '''Yields the addresses covered by each direct member of an object
+        group, in member order, as (position, first, intervals):
         
-        return total
+            position: The position of the member in the group
+            first: The position the same member was first listed at, which
+                is `position` unless the member is listed more than once
+            intervals: Tuple of (start, end) packed IPv4 intervals. A 
+                `group-object` member yields the expansion of the nested 
+                group, expanding it if necessary. Members that are not IPv4
+                addresses, such as fqdn objects, yield an empty tuple.
+        
+        Raises:
+            ValueError: If a referenced object or group does not exist, or 
+                if a nested group references itself through a cycle
+        '''
+        
+        seen= {}
+        for position, key in enumerate(
+                zip(group._codes, group._targets, group._masks)):
+            first= seen.setdefault(key, position)
+            code, target, mask= key
+            
+            if code in (_NETWORK, _HOST):
+                intervals= ((target & mask, target | ~mask & 0xffffffff),)
+            
+            elif code == _OBJECT | _SYMBOLIC:
+                interval= self.get_object(
+                    _symbols[target], referrer= group.name).interval()
+                intervals= () if interval is None else (interval,)
+            
+            elif code == _GROUP_OBJECT | _SYMBOLIC:
+                intervals= self.expand(_symbols[target])
+            
+            else: intervals= ()
+            
+            yield position, first, intervals
     
-    def _object_weight(self, name):
-        '''Searches the global list of network objects for a match with the 
-        same name as the `name` argument, then returns it's weight.'''
-        global objects
+    def topological_order(self, names= None, done= None):
+        '''Orders the named groups, and all of the groups nested within 
+        them, so that every group comes after the groups it references. 
+        Groups which already have a memoized weight are skipped. 
+        
+        The walk is iterative, so deeply nested groups cannot exhaust the 
+        stack.
         
-        # Search the global objects list for a match
-        for o in objects:
-            if name== o.name:
-                return o.weight
+        Optional Args:
+            names (list of String): The groups to order. Defaults to every
+                group in the registry.
+            done (Container of String): The groups to skip, such as the 
+                memo of a resolve method. Only tested with `in`, so the 
+                memo is not copied. Defaults to the groups with a memoized
+                weight.
+            
+        Returns:
+            List of String: Group names, innermost first
             
-        # Raise an error if the object was not found
-        raise ValueError('Object [{}] referenced in object group [{}] but '
-            ' not found in objects'.format(o.name, self.name))
+        Raises:
+            ValueError: If a referenced group does not exist, or if a cyclic 
+                group-object reference is found
+        '''
         
-    def _object_group_weight(self, name):
-        global object_groups
+        if names is None: names= list(self.groups)
         
-        # Search the global objects list for a match
-        for o in object_groups:
-            if name== o.name:
-                return o.weight
+        if done is None: done= self._weights
+        
+        order= []
+        ordered= set()
+        
+        for root in names:
+            if root in done or root in ordered: continue
+            
+            # path holds the chain of groups currently being walked, and 
+            # stack holds an iterator over the nested groups of each
+            path= [root]
+            on_path= {root}
+            stack= [iter(self._subgroups(self.get_group(root)))]
             
-        # Raise an error if the object was not found
-        raise ValueError('Object-group [{}] referenced in object group [{}] but '
-            ' not found in objects'.format(o.name, self.name))
+            while stack:
+                for child in stack[-1]:
+                    if child in done or child in ordered: continue
+                    
+                    if child in on_path:
+                        cycle= path[path.index(child):] + [child]
+                        raise ValueError(
+                            'Cyclic object-group reference: {}'.format(
+                                ' -> '.join(cycle)))
+                    
+                    group= self.get_group(child, referrer= path[-1])
+                    path.append(child)
+                    on_path.add(child)
+                    stack.append(iter(self._subgroups(group)))
+                    break
+                
+                else:
+                    # Every nested group has been ordered
+                    stack.pop()
+                    name= path.pop()
+                    on_path.discard(name)
+                    ordered.add(name)
+                    order.append(name)
+        
+        return order
+    
+    @staticmethod
+    def _subgroups(group):
+        return group.references(('group-object',))
+
         
 
+# The attribute lines which set the type of a network object
+_OBJECT_TYPES= ('host', 'subnet', 'range', 'fqdn')
+
+# Classifies a line of `show run object-group network` output. The name of
+# the last matched group identifies the kind of line.
+_GROUP_LINE= re.compile(r'''
+    (?:
+        object-group\ network\ (?P<name>.+)
+      | \ +description\ (?P<description>.*)
+      | \ +network-object\ (?:
+            (?P<address>\d{1,3}(?:\.\d{1,3}){3})
+            \ (?P<netmask>\d{1,3}(?:\.\d{1,3}){3})
+          | (?P<kind>\S+)\ (?P<target>.+)
+        )
+      | \ +group-object\ (?P<group>.+)
+      | (?P<separator>!.*)
+      | \s*
+    )$''', re.X | re.I)
+
+
 class networkObject():
+    '''A `object network`. Host and subnet targets are stored as packed 
+    IPv4 addresses.'''
+    
+    __slots__= ('name', 'description', 'type', '_target', 'cidr')
+    
     def __init__(self, **kwargs):
         self.name= kwargs.get('name')
         self.description= kwargs.get('description')
         self.type= kwargs.get('type')
         self.target= kwargs.get('target')
+        self.cidr= kwargs.get('cidr')
         
     def __str__(self):
         pt= prettytable.PrettyTable(['Name', self.name])
         pt.align= 'l'
         
         for item in dir(self):
-            if item == 'members':
-                pt.add_row(['Members', ''])
-                for m in self.members:
-                    pt.add_row(['', m['type'] + ': ' + m['target']])
-            
-            elif not item.startswith("_") and 'name' not in item: 
+            if (not item.startswith("_") and 'name' not in item and
+                not callable(getattr(self, item))): 
                 pt.add_row([item.title(), getattr(self, item)])
                 
         return str(pt)
+    
+    @property
+    def target(self):
+        if isinstance(self._target, int): return util.int_to_ip(self._target)
+        return self._target
+    
+    @target.setter
+    def target(self, value):
+        # Pack single IPv4 addresses
+        if isinstance(value, str) and value[:1].isdigit():
+            try: value= util.ip_to_int(value)
+            except ValueError: pass
+        
+        self._target= value
 
     @property
     def weight(self):
         # Weight fqdn's heavier
         if self.type== 'fqdn': return 3
         else: return 1
+    
+    def address(self):
+        '''Returns the packed IPv4 address of a host or subnet target, or 
+        None for any other target.'''
+        return self._target if isinstance(self._target, int) else None
+    
+    def interval(self):
+        '''Returns the first and last packed IPv4 addresses covered by a 
+        host, subnet or range target, or None for any other target.'''
+        
+        if isinstance(self._target, int):
+            if self.cidr is None: return (self._target, self._target)
+            size= 1 << (32 - self.cidr)
+            start= self._target & -size
+            return (start, start + size - 1)
+        
+        if self.type == 'range':
+            try: start, end= map(util.ip_to_int, self._target.split())
+            except ValueError: return None
+            return (start, end)
+        
+        return None
+        
+
+class textBlock():
+    '''A lazy view of one top level block (a header line and its indented
+    lines) in the output of `show run`. Only the offsets of the block are
+    stored, so splitting a large output does not copy it. Use `str()` to 
+    get the text of the block.
+    
+    Args:
+        text (String): The complete output
+        start (Integer): Offset of the first character of the block
+        end (Integer): Offset just past the last character of the block
+    '''
+    
+    __slots__= ('text', 'start', 'end')
+    
+    def __init__(self, text, start, end):
+        self.text= text
+        self.start= start
+        self.end= end
+        
+    def __str__(self):
+        return self.text[self.start:self.end]
+    
+    def __repr__(self):
+        return 'textBlock({!r}, {}, {})'.format(
+            self.header, self.start, self.end)
+    
+    def __len__(self):
+        return self.end - self.start
+    
+    def __eq__(self, other):
+        if isinstance(other, textBlock): other= str(other)
+        return str(self) == other
+    
+    def __hash__(self):
+        return hash(str(self))
+    
+    @property
+    def header(self):
+        '''The first line of the block'''
+        eol= self.text.find('\n', self.start, self.end)
+        if eol == -1: eol= self.end
+        return self.text[self.start:eol].rstrip('\r')
+    
+    def lines(self):
+        '''Yields the lines of the block one at a time, without their line
+        endings.'''
+        pos= self.start
+        while pos < self.end:
+            eol= self.text.find('\n', pos, self.end)
+            if eol == -1: eol= self.end
+            yield self.text[pos:eol].rstrip('\r')
+            pos= eol + 1
         
 
 def split_objects(strobjects):
     '''Takes the output of `show run object(-group) network`
-    from a firewall and splits it into a list of objects
+    from a firewall and splits it into a list of objects.
+    
+    A block starts at every unindented line and takes in the indented lines
+    that follow it. `!` lines and blank lines only separate blocks. The 
+    text is scanned once, line by line, so the time taken is linear in the
+    size of the output.
+    
+    Returns:
+        List of textBlock: Views of each block in the original text
     '''
     
-    results= re.findall(r'^(\w.*?$[\s\S]*?)(?=^\w)', strobjects, re.M)
+    results= []
+    start= None
+    end= None
+    pos= 0
+    length= len(strobjects)
+    
+    while pos < length:
+        eol= strobjects.find('\n', pos)
+        if eol == -1: eol= length
+        
+        # The end of the line's content, leaving out any carriage return
+        stop= eol
+        if stop > pos and strobjects[stop - 1] == '\r': stop-= 1
+        
+        first= strobjects[pos]
+        
+        # Indented lines continue the current block
+        if first in ' \t':
+            if strobjects[pos:stop].strip() and start is not None: 
+                end= stop
+        
+        # Anything else at the left margin ends the current block
+        elif first not in '\r\n':
+            if start is not None: 
+                results.append(textBlock(strobjects, start, end))
+                start= None
+            
+            if first != '!':
+                start= pos
+                end= stop
+        
+        pos= eol + 1
+    
+    if start is not None: 
+        results.append(textBlock(strobjects, start, end))
+    
     return results
     
 
-def process_objects(strobjects):
-    '''Takes the output of `show run object network`
-    from a firewall and converts it into a list of
-    networkObject objects
+def iter_lines(chunks):
+    '''Reassembles complete lines from an iterable of arbitrarily sized 
+    chunks of text, such as the reads from a socket or a CLI channel. 
+    Only the current partial line is kept in memory.
+    
+    Args:
+        chunks (Iterable of String): The raw text
+        
+    Yields:
+        String: Each line of the text, without its line ending
     '''
     
-    split_list= split_objects(strobjects)
-    
-    objects= []
-    for x in split_list:
-        n= networkObject()
-        name= re.match(r'^object network (.*?)$', x, re.M)
-        if name is None or name[1] is None: 
-            raise ValueError('Problem parsing name in [\n{}\n]'.format(x))
-        else: n.name= name[1] 
-        
-        # Get the description. Does not fail if not found.
-        desc= re.search(r'^ description (.*?)$', x, re.M|re.I)
-        if desc is not None and desc[1] is not None:
-            n.description = desc[1]
-        
-        # Get the type, with some error checking 
-        result= re.search(r'^ (host|subnet|range|fqdn) (.*)?$', x, re.M|re.I)
-        if (result is None or
-            result.group(1) is None or
-            result.group(2) is None): 
-            n.type= None
-            n.target= None
-        else:
-            n.type= result.group(1)
-            
-            if n.type == 'subnet':
-                t= result.group(2).split(' ')
-                n.target = t[0]
-                n.cidr= util.netmask_to_cidr(t[1])
-            
-            if n.type== 'host':
-                n.target= result.group(2)
-                n.cidr= 32
-                
-            else:
-                n.target= result.group(2)
-            
-        objects.append(n)    
+    partial= ''
+    for chunk in chunks:
+        lines= (partial + chunk).split('\n')
+        partial= lines.pop()
         
-    return objects    
+        for line in lines: yield line.rstrip('\r')
+    
+    if partial: yield partial.rstrip('\r')
 
 
-def process_object_groups(strobjects):
-    '''Takes the output of `show run object-group network`
-    from a firewall and converts it into a list of
-    objectGroup objects
+def iter_blocks(lines):
+    '''The streaming form of split_objects. Groups lines into top level 
+    blocks as they arrive, holding only the current block in memory.
+    
+    Args:
+        lines (Iterable of String): The lines of the output, such as 
+            iter_lines over a CLI channel
+    
+    Yields:
+        textBlock: Each block, as a view of its own text
     '''
     
-    split_list= split_objects(strobjects) 
+    block= []
+    size= 0
     
-    objects= []
-    for x in split_list:
-        n= objectGroup()
+    for line in lines:
+        line= line.rstrip('\r\n')
+        
+        # Indented lines continue the current block. Blank and whitespace 
+        # lines only count once a later indented line follows them.
+        if not line or line[0] in ' \t':
+            if block: 
+                block.append(line)
+                if line.strip(): size= len(block)
+            continue
+        
+        # Anything else at the left margin ends the current block
+        if block: 
+            text= '\n'.join(block[:size])
+            yield textBlock(text, 0, len(text))
+            block= []
+        
+        if line[0] != '!':
+            block= [line]
+            size= 1
+    
+    if block: 
+        text= '\n'.join(block[:size])
+        yield textBlock(text, 0, len(text))
+
 
-        #Get members
-        for line in x.split('\n'):
+def iter_objects(lines):
+    '''Parses the output of `show run object network` one line at a 
+    time, yielding each networkObject as soon as its block ends. Only the
+    object currently being parsed is held in memory.
+    
+    Args:
+        lines (Iterable of String): The lines of the output. Any iterable 
+            will do, such as an open file or `iter_lines` over a socket. 
+            A single string is also accepted.
             
-            # Skip blank lines
-            if re.match(r'^\s*?$', line): continue
+    Yields:
+        networkObject: Each object, in the order it appears in the output
+        
+    Raises:
+        ValueError: If a top level line is not an `object network` header
+    '''
+    
+    if isinstance(lines, str): lines= io.StringIO(lines)
+    
+    n= None
+    for line in lines:
+        line= line.rstrip('\r\n')
+        
+        # Skip blank lines
+        if not line.strip(): continue
+        
+        # Indented lines are the attributes of the current object
+        if line[0] == ' ':
+            if n is None: 
+                raise ValueError('Problem parsing name in [\n{}\n]'.format(
+                    line))
             
-            name= re.match(r'^object-group network (.*?)$', line, re.M)
-            if not (name is None or name[1] is None): 
-                n.name= name[1]
-                continue 
+            key, _, value= line.strip().partition(' ')
+            key= key.lower()
             
-            # Get the description. Does not fail if not found.
-            desc= re.search(r'^ description (.*?)$', line, re.M|re.I)
-            if desc is not None and desc[1] is not None:
-                n.description = desc[1]
-                continue
+            # Get the description. Only the first one counts.
+            if key == 'description':
+                if n.description is None: n.description= value
             
-            # Check if it's a network-object 
-            result= re.match(r'^ network-object (.*?) (.*?)$', line, re.M|re.I)
-            if not (result is None or
-                result.group(1) is None or
-                result.group(2) is None): 
+            # Get the type, with some error checking
+            elif key in _OBJECT_TYPES and n.type is None and value:
+                n.type= key
                 
-                # If the network_object is a address/mask combo
-                if util.is_ip(result[1]) and util.is_ip(result[2]):
-                    n.members.append(
-                    {'type': 'network',
-                     'target': result[1] + ' / ' + result[2]
-                    })
+                if key == 'subnet':
+                    t= value.split(' ')
+                    n.target= t[0]
+                    n.cidr= util.netmask_to_cidr(t[1])
+                
+                elif key == 'host':
+                    n.target= value
+                    n.cidr= 32
                     
                 else:
-                    n.members.append(
-                        {'type': result[1],
-                         'target': result[2]
-                        })
-                continue
+                    n.target= value
             
-            # Check if it's an object-group
-            result= re.match(r'^ group-object (.*?)$', line, re.M|re.I)
-            if not (result is None or result[1] is None):
-                n.members.append(
-                    {'type': 'group-object',
-                     'target': result[1]
-                    })
-                continue
+            continue
+        
+        # Any other line ends the current object
+        if n is not None: 
+            yield n
+            n= None
+        
+        # Block separators
+        if line[0] == '!': continue
+        
+        if not line.startswith('object network '):
+            raise ValueError('Problem parsing name in [\n{}\n]'.format(line))
+        
+        n= networkObject(name= line[len('object network '):])
+    
+    if n is not None: yield n
+
+
+def block_name(block):
+    '''Returns the name of the object or object group defined by a block
+    from split_objects.'''
+    return block.header.split(' ', 2)[-1]
+
+
+def block_hash(block):
+    '''Returns a digest of the text of a block from split_objects, used to
+    tell whether it changed between two collections. Line endings are 
+    normalized, so the digest is the same however the text was read.'''
+    return hashlib.blake2b('\n'.join(block.lines()).encode(), 
+                           digest_size= 16).hexdigest()
+
+
+@instrument.timed('objects.parse_incremental')
+def parse_incremental(strobjects, parser, previous= None, hashes= None):
+    '''
+    Parses the output of `show run object(-group) network`, reusing the 
+    parsed items from an earlier collection for every block whose text is 
+    unchanged. Only new and changed blocks are given to the parser.
+    
+    Args:
+        strobjects (String or Iterable of String): The output to parse, or
+            its lines as they arrive, such as iter_lines over a CLI channel
+        parser (Function): Parses the lines of a block into items, such as 
+            iter_objects or iter_object_groups
+    
+    Optional Args:
+        previous (List): The items parsed from the earlier collection
+        hashes (Dict): Name -> block_hash of each block in the earlier 
+            collection
+    
+    Returns:
+        Dict:
+            'items': The parsed items, in the order of the output
+            'hashes': Name -> block_hash of each block
+            'delta': {'added', 'modified', 'deleted'}: Lists of names
+    '''
+    
+    if hashes is None: hashes= {}
+    old= {x.name: x for x in previous or []}
+    
+    items= []
+    new_hashes= {}
+    delta= {'added': [], 'modified': [], 'deleted': []}
+    
+    if isinstance(strobjects, str): blocks= split_objects(strobjects)
+    else: blocks= iter_blocks(strobjects)
+    
+    for block in blocks:
+        name= block_name(block)
+        digest= block_hash(block)
+        new_hashes[name]= digest
+        
+        if hashes.get(name) == digest and name in old:
+            items.append(old[name])
+            continue
+        
+        items.extend(parser(block.lines()))
+        delta['added' if name not in hashes else 'modified'].append(name)
+    
+    delta['deleted']= [x for x in hashes if x not in new_hashes]
+    
+    reparsed= len(delta['added']) + len(delta['modified'])
+    instrument.count('objects.blocks_parsed', reparsed)
+    instrument.count('objects.blocks_reused', len(new_hashes) - reparsed)
+    
+    return {'items': items, 'hashes': new_hashes, 'delta': delta}
+
+
+@instrument.timed('objects.process_objects')
+def process_objects(strobjects, workers= None):
+    '''Takes the output of `show run object network`
+    from a firewall and converts it into a list of
+    networkObject objects. Large outputs are parsed in parallel, see 
+    parse_parallel.
+    '''
+    
+    return parse_parallel(strobjects, iter_objects, workers)
+
 
+def iter_object_groups(lines):
+    '''Parses the output of `show run object-group network` one line at a
+    time, yielding each objectGroup as soon as its block ends. Every line is
+    classified by a single match against a precompiled pattern, and the 
+    members are built directly from the named groups of that match.
+    
+    Args:
+        lines (Iterable of String): The lines of the output. Any iterable 
+            will do, such as an open file or `iter_lines` over a socket. 
+            A single string is also accepted.
+            
+    Yields:
+        objectGroup: Each object group, in the order it appears in the output
+        
+    Raises:
+        ValueError: If a line could not be classified
+    '''
+    
+    if isinstance(lines, str): lines= io.StringIO(lines)
+    
+    n= None
+    for line in lines:
+        line= line.rstrip('\r\n')
+        
+        m= _GROUP_LINE.match(line)
+        if m is None: 
             raise ValueError('None result found from line [{}]'.format(line))
-                    
-        objects.append(n)    
-    return objects    
+        
+        kind= m.lastgroup
+        
+        # Skip blank lines
+        if kind is None: continue
+        
+        if kind == 'name':
+            if n is not None: yield n
+            n= objectGroup(name= m.group('name'))
+            continue
+        
+        # Block separators
+        if kind == 'separator': continue
+        
+        if n is None: 
+            raise ValueError('None result found from line [{}]'.format(line))
+        
+        if kind == 'netmask':
+            # The network_object is a address/mask combo
+            n._append_network(m.group('address'), m.group('netmask'))
+        
+        elif kind == 'target':
+            member= m.group('kind').lower()
+            if member == 'object':
+                n._append_symbol(_OBJECT, m.group('target'))
+            elif member == 'host':
+                n._append('host', m.group('target'))
+            else:
+                # A `names` alias and a netmask. The alias is not resolved, 
+                # so the network is kept by name.
+                n._append_symbol(_NETWORK, '{} / {}'.format(
+                    m.group('kind'), m.group('target')))
+        
+        elif kind == 'group':
+            n._append_symbol(_GROUP_OBJECT, m.group('group'))
+        
+        else: 
+            n.description= m.group('description')
+    
+    if n is not None: yield n
+
+
+@instrument.timed('objects.process_object_groups')
+def process_object_groups(strobjects, workers= None):
+    '''Takes the output of `show run object-group network`
+    from a firewall and converts it into a list of
+    objectGroup objects. Large outputs are parsed in parallel, see 
+    parse_parallel.
+    '''
+    
+    return parse_parallel(strobjects, iter_object_groups, workers)
+
+
+def split_chunks(strobjects, count):
+    '''
+    Splits the output of `show run object(-group) network` into about 
+    `count` chunks of similar size. Every chunk ends at a block boundary, 
+    so each can be parsed on its own.
+    
+    Returns:
+        List of String: The chunks, in order
+    '''
+    
+    chunks= []
+    length= len(strobjects)
+    size= max(-(-length // max(count, 1)), 1)
+    start= 0
+    
+    while start < length:
+        pos= start + size
+        
+        # Move on to the start of the next unindented line
+        while pos < length:
+            pos= strobjects.find('\n', pos)
+            if pos == -1: 
+                pos= length
+                break
+            
+            pos+= 1
+            if pos == length or strobjects[pos] not in ' \t': break
+        
+        chunks.append(strobjects[start:pos])
+        start= pos
+    
+    return chunks
+
+
+def _pack_objects(objs):
+    '''Reduces network objects to tuples of their fields, which pickle in
+    far less space than the objects themselves.'''
+    return [(o.name, o.description, o.type, o._target, o.cidr) for o in objs]
+
+
+def _unpack_objects(packed):
+    objs= []
+    for name, description, type, target, cidr in packed:
+        # The target is already packed, so skip the target setter
+        o= networkObject.__new__(networkObject)
+        o.name, o.description, o.type, o._target, o.cidr= \
+            name, description, type, target, cidr
+        objs.append(o)
+    
+    return objs
+
+
+def _pack_groups(groups):
+    '''Reduces object groups to the concatenation of their member arrays.
+    Symbol ids are only valid in the process that assigned them, so 
+    symbolic targets are renumbered into a table of just the names used.'''
+    
+    codes= array('B')
+    targets= array('I')
+    masks= array('I')
+    sizes= array('I')
+    for g in groups:
+        sizes.append(len(g._codes))
+        codes.extend(g._codes)
+        targets.extend(g._targets)
+        masks.extend(g._masks)
+    
+    # Symbol id in this process -> position in the table
+    table= {}
+    for i, code in enumerate(codes):
+        if code & _SYMBOLIC: 
+            targets[i]= table.setdefault(targets[i], len(table))
+    
+    return {'names': [g.name for g in groups],
+            'descriptions': [g.description for g in groups],
+            'sizes': sizes,
+            'codes': codes,
+            'targets': targets,
+            'masks': masks,
+            'symbols': [_symbols[x] for x in table],
+            }
+
+
+def _unpack_groups(packed):
+    codes= packed['codes']
+    symbols= _intern_many(packed['symbols'])
+    
+    targets= array('I', [symbols[target] if code & _SYMBOLIC else target
+                         for code, target in zip(codes, packed['targets'])])
+    masks= packed['masks']
+    
+    groups= []
+    start= 0
+    for name, description, size in zip(packed['names'], 
+                                       packed['descriptions'], 
+                                       packed['sizes']):
+        g= objectGroup(name= name, description= description)
+        g._codes= codes[start:start + size]
+        g._targets= targets[start:start + size]
+        g._masks= masks[start:start + size]
+        groups.append(g)
+        start+= size
+    
+    return groups
+
+
+def _parse_chunk(parser, chunk):
+    '''Runs in a worker process of parse_parallel.'''
+    
+    items= list(parser(chunk))
+    if parser is iter_object_groups: return _pack_groups(items)
+    return _pack_objects(items)
+
+
+def parse_parallel(strobjects, parser, workers= None, threshold= None):
+    '''
+    Parses the output of `show run object(-group) network` in several 
+    processes at once. The output is split into chunks at block boundaries,
+    each chunk is parsed in a worker process, and the results are sent back
+    as plain arrays and tuples rather than pickled objects, then rebuilt 
+    here in order. 
+    
+    Starting the workers and copying the text to them costs more than it 
+    saves for small outputs, so anything shorter than the threshold, or 
+    anything not given as a single string, is parsed here instead.
+    
+    Args:
+        strobjects (String or Iterable of String): The output to parse
+        parser (Function): iter_objects or iter_object_groups
+    
+    Optional Args:
+        workers (Integer): Number of worker processes. Defaults to the 
+            number of CPUs. 1 always parses here.
+        threshold (Integer): Shortest output, in characters, to parse in
+            parallel. Defaults to gvars.PARALLEL_PARSE_THRESHOLD.
+    
+    Returns:
+        List: The parsed items, in the order of the output
+    '''
+    
+    if workers is None: workers= os.cpu_count() or 1
+    if threshold is None: threshold= gvars.PARALLEL_PARSE_THRESHOLD
+    
+    if (workers < 2 or not isinstance(strobjects, str) 
+            or len(strobjects) < threshold):
+        return list(parser(strobjects))
+    
+    unpack= _unpack_groups if parser is iter_object_groups else _unpack_objects
+    
+    # A few chunks per worker, so that a slow chunk does not hold up the rest
+    chunks= split_chunks(strobjects, workers * 4)
+    instrument.count('objects.parallel_chunks', len(chunks))
+    
+    items= []
+    with ProcessPoolExecutor(max_workers= workers) as executor:
+        for packed in executor.map(_parse_chunk, 
+                                   [parser] * len(chunks), chunks):
+            items.extend(unpack(packed))
+    
+    return items
     
        
+def format_report(objects, members):
+    '''Formats the complexity report of printObjects without printing it.
+    
+    Args:
+        objects (List): The objects or object groups to report on
+        members (Boolean): If True, list the members of each group
+    
+    Yields:
+        String: A table for each object, heaviest first
+    '''
+    
+    # Weigh the groups of each registry in one pass, rather than resolving
+    # them one at a time as the sort asks for each weight
+    registries= {}
+    for x in objects:
+        if getattr(x, '_registry', None) is not None:
+            registries.setdefault(x._registry, []).append(x.name)
+    for registry, names in registries.items(): registry.resolve_weights(names)
+    
+    for x in sorted(objects, key=lambda y: y.weight, reverse=True):
+        pt= prettytable.PrettyTable(['Name', x.name])
+        pt.align= 'l'
+        
+        for item in dir(x):
+            if item == 'members':
+                if members:
+                    pt.add_row(['Members', ''])
+                    for type, target in x.iter_members():
+                        pt.add_row(['', type + ': ' + target])
+            
+            elif (not item.startswith("_") and 'name' not in item and
+                  not callable(getattr(x, item))): 
+                pt.add_row([item.title(), getattr(x, item)])
+        
+        yield str(pt)
+
+
 def printObjects(objects, wait, members):
     with open('firewall_object_complexity_report.txt', 'w') as outfile:
-        for x in sorted(objects, key=lambda y: y.weight, reverse=True):
-            pt= prettytable.PrettyTable(['Name', x.name])
-            pt.align= 'l'
-            
-            for item in dir(x):
-                if item == 'members':
-                    if members:
-                        pt.add_row(['Members', ''])
-                        for m in x.members:
-                            pt.add_row(['', m['type'] + ': ' + m['target']])
-                
-                elif not item.startswith("_") and 'name' not in item: 
-                    pt.add_row([item.title(), getattr(x, item)])
-                
-            outfile.write(str(pt) + '\n')
-            print(pt)
+        for table in format_report(objects, members):
+            outfile.write(table + '\n')
+            print(table)
             if wait: input('...')
         
 
+@instrument.timed('objects.getObjects_fromConnection')
+def getObjects_fromConnection(connection, save= False, previous= None,
+                              deadline= None):
+    '''
+    Collects the objects and object groups over an open firewall connection,
+    then saves those objects into python class objects. The output is 
+    parsed as it streams in, so parsing overlaps the transfer and the whole
+    output is never held in memory at once.
+    
+    Args:
+        connection (Object): A Netmiko connection in enable mode, already 
+            in the right context
+    
+    Optional Args:
+        save (Boolean): If True, also save the raw output to `objects.txt` 
+            and `objectgroups.txt` for getObjects_fromFile
+        previous (Dict): An earlier result for the same context, such as 
+            a snapshot from db.load_snapshot. Only the blocks that changed 
+            since then are parsed.
+        deadline (Float): A time.monotonic() time by which both outputs 
+            must have been read, see cli.stream_command
+    
+    Returns:
+        Dict: As returned by getObjects_fromText
+    '''
+    
+    # Save the output to file as it arrives
+    objects_file= open('objects.txt', 'w') if save else None
+    groups_file= open('objectgroups.txt', 'w') if save else None
+    
+    try:
+        print('Getting objects and object-groups')
+        objects= cli.stream_command(
+            connection, 'show run object network', 
+            tee= objects_file, deadline= deadline)
+        object_groups= cli.stream_command(
+            connection, 'show run object-group network', 
+            tee= groups_file, deadline= deadline)
+        
+        # Each command is only sent when its output is first read, so the 
+        # objects are read and parsed before the groups are requested
+        return getObjects_fromText(iter_lines(objects), 
+                                   iter_lines(object_groups), 
+                                   previous= previous)
+    finally:
+        # If parsing failed, read the rest of the output off the channel
+        # now, before anything else is sent on the connection
+        objects.close()
+        object_groups.close()
+        
+        for outfile in (objects_file, groups_file):
+            if outfile is not None: outfile.close()
+
+
+def getObjects_fromText(strobjects, strgroups, previous= None):
+    '''
+    Converts the output of `show run object network` and `show run 
+    object-group network` into python class objects. If an earlier result 
+    is supplied, the objects and groups whose text has not changed are 
+    reused from it and only the changed blocks are parsed.
+    
+    Args:
+        strobjects (String or Iterable of String): The output of `show run 
+            object network`, or its lines as they arrive
+        strgroups (String or Iterable of String): The output of `show run 
+            object-group network`, or its lines as they arrive
+    
+    Optional Args:
+        previous (Dict): An earlier result with 'objects', 'groups' and 
+            'hashes', such as one returned by this function or by 
+            db.load_snapshot
+    
+    Returns:
+        Dict:
+            'objects': List of networkObject
+            'groups': List of objectGroup
+            'registry': objectRegistry of both
+            'hashes': {'objects', 'groups'}: Name -> hash of each block
+            'delta': {'objects', 'groups'}: The changes since `previous`,
+                as returned by parse_incremental
+    '''
+    
+    if previous is None: previous= {}
+    hashes= previous.get('hashes') or {}
+    
+    objects= parse_incremental(strobjects, 
+                               iter_objects, 
+                               previous.get('objects'), 
+                               hashes.get('objects'))
+    
+    object_groups= parse_incremental(strgroups, 
+                                     iter_object_groups, 
+                                     previous.get('groups'), 
+                                     hashes.get('groups'))
+    
+    return {'objects': objects['items'], 
+            'groups': object_groups['items'],
+            'registry': objectRegistry(objects['items'], 
+                                       object_groups['items']),
+            'hashes': {'objects': objects['hashes'], 
+                       'groups': object_groups['hashes']},
+            'delta': {'objects': objects['delta'], 
+                      'groups': object_groups['delta']},
+            }
+    
+
+@instrument.timed('objects.getObjects_fromFirewall')
 def getObjects_fromFirewall(host,
                             username= None,
                             password= None,
-                            context= None): 
+                            context= None,
+                            timeout= None,
+                            save= True,
+                            pool= None,
+                            previous= None,
+                            deadline= None): 
     '''
     Connects to a remote firewall and collects the objects from it, then
-    saves those objects into python class objects'''
+    saves those objects into python class objects
+    
+    Optional Args:
+        timeout (Integer): Connection timeout in seconds, passed to Netmiko
+        save (Boolean): If True, also save the raw output to `objects.txt` 
+            and `objectgroups.txt` for getObjects_fromFile
+        pool (cli.sessionPool): If supplied, take the connection from this 
+            pool and return it afterwards instead of opening a new one
+        previous (Dict): An earlier result for the same context, so that 
+            only changed blocks are parsed
+        deadline (Float): A time.monotonic() time by which the collection 
+            must be done. Bounds the wait for a pooled session and the 
+            reading of the output.
+    '''
+    
+    if pool is not None:
+        wait= None
+        if deadline is not None: wait= max(deadline - monotonic(), 0)
+        
+        with pool.session(host, 
+                          user= username, 
+                          password= password, 
+                          context= context,
+                          timeout= timeout,
+                          wait= wait,
+                          ) as connection:
+            return getObjects_fromConnection(
+                connection, save= save, previous= previous, 
+                deadline= deadline)
       
     connection= cli.connect_firewall(user= username,
                                  password= password,
                                  host= host,
                                  context= context,
+                                 timeout= timeout,
                                  )
     
-    print('Getting objects')
-    objects= connection.send_command_expect(
-        'show run object network', delay_factor= 10)
+    try: 
+        return getObjects_fromConnection(
+            connection, save= save, previous= previous, deadline= deadline)
+    finally: connection.disconnect()
     
-    # Save the objects to file
-    with open('objects.txt', 'w') as outfile: outfile.write(objects)
-      
-    print('Getting object-groups')
-    object_groups= connection.send_command_expect(
-        'show run object-group network', delay_factor= 10)
-    
-    # Save the object groups to file
-    with open('objectgroups.txt', 'w') as outfile: outfile.write(object_groups)
-    
-    objects= process_objects(objects)
-    object_groups= process_object_groups(object_groups)
+
+def parse_file(path, parser):
+    '''
+    Parses a saved `show run object(-group) network` output file. Files 
+    large enough to be parsed in parallel are read whole for 
+    parse_parallel; anything smaller is parsed one line at a time, without
+    reading the whole file into memory.
     
-    connection.close()
+    Args:
+        path (String): The file
+        parser (Function): iter_objects or iter_object_groups
     
-    return {'objects': objects, 'groups': object_groups}
+    Returns:
+        List: The parsed items, in the order of the file
+    '''
     
+    with open(path, 'r') as infile:
+        if (os.path.getsize(path) < gvars.PARALLEL_PARSE_THRESHOLD 
+                or (os.cpu_count() or 1) < 2):
+            return list(parser(infile))
+        
+        return parse_parallel(infile.read(), parser)
+
 
 def getObjects_fromFile(): 
     '''Imports previously saved objects from files'''
     
-    global objects, object_groups
-    
-    with open('objects.txt', 'r') as infile: 
-        objects= infile.read()
+    objects= parse_file('objects.txt', iter_objects)
+    object_groups= parse_file('objectgroups.txt', iter_object_groups)
     
-    with open('objectgroups.txt', 'r') as infile: 
-        object_groups= infile.read()
-        
-    objects= process_objects(objects)
-    object_groups= process_object_groups(object_groups)
-    
-    return {'objects': objects, 'groups': object_groups}
+    return {'objects': objects, 
+            'groups': object_groups,
+            'registry': objectRegistry(objects, object_groups),
+            }
     
     
 def main():
     args= parse_cli()
     
+    with profiler.profile(args, 'objects'):
+        if args.host: 
+            result= getObjects_fromFirewall(args.host,
+                                            username= args.username,
+                                            password= args.password,
+                                            context= args.context,
+                                            )
+        else: result= getObjects_fromFile()
+        
+        printObjects(result['groups'], args.wait, args.members)
 
 
 if __name__ == '__main__':
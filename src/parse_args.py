@@ -4,7 +4,7 @@ Created on Mar 31, 2017
 @author: Wyko
 '''
 
-import argparse, textwrap
+import argparse, textwrap, profiler
 
 
 def make_parser() -> argparse.ArgumentParser:
@@ -55,10 +55,49 @@ def make_parser() -> argparse.ArgumentParser:
         default= None,
         )
     
+    add_profile_arguments(parser)
     
     return parser
 
 
+def add_profile_arguments(parser):
+    '''
+    Adds the options read by profiler.profile to a parser. Called by 
+    make_parser, and usable on its own by tools with their own options.
+    
+    Args:
+        parser (argparse.ArgumentParser): The parser to add them to
+    '''
+    
+    profiling = parser.add_argument_group('Profiling')
+    
+    profiling.add_argument(
+        '--profile',
+        action="store_true",
+        dest= 'profile',
+        help= 'Profile the run, and save the profile and a memory report\n'
+              'to the runtime folder',
+        )
+    
+    profiling.add_argument(
+        '--profile-mode',
+        action="store",
+        dest= 'profile_mode',
+        choices= profiler.MODES,
+        default= profiler.MODES[0],
+        help= 'Profile with cProfile (default) or by sampling',
+        )
+    
+    profiling.add_argument(
+        '--profile-top',
+        action="store",
+        dest= 'profile_top',
+        type= int,
+        default= 20,
+        help= 'Number of functions to print when profiling',
+        )
+
+
 def parse_args():
     '''
     Creates an argparse CLI parser and parses the CLI options.
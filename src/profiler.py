@@ -0,0 +1,241 @@
+'''
+Created on Oct 18, 2026
+
+Profiles a FireCheck tool from the command line. Every tool built on
+parse_args.make_parser accepts `--profile`, which runs the tool under cProfile
+(`--profile-mode cprofile`, the default) or a sampling profiler
+(`--profile-mode sample`), covering every thread. The hottest functions are
+printed when the tool finishes. The profile and a memory high-water report 
+from tracemalloc are saved under gvars.RUN_PATH.
+
+    with profiler.profile(args, 'objects'):
+        ...
+'''
+
+import cProfile, pstats, sys, threading, time, tracemalloc, os, gvars
+
+from collections import Counter
+from contextlib import contextmanager
+
+
+MODES= ('cprofile', 'sample')
+
+
+class sampler():
+    '''Samples the call stacks of every thread at a fixed interval, from a
+    background thread. Far cheaper than cProfile for long runs, at the cost
+    of only seeing functions that run for longer than the interval.'''
+
+    def __init__(self, interval= None):
+        '''
+        Optional Args:
+            interval (Float): Seconds between samples. Defaults to
+                gvars.PROFILE_INTERVAL.
+        '''
+
+        self.interval= interval or gvars.PROFILE_INTERVAL
+
+        # Stack, as the thread name followed by a (file, line, function) 
+        # tuple per frame from the outermost in, -> the number of samples
+        # it was seen in
+        self.stacks= Counter()
+        
+        # The number of stacks sampled, one per thread per interval
+        self.samples= 0
+
+        self._stop= threading.Event()
+        self._thread= None
+
+    def start(self):
+        self._stop.clear()
+        self._thread= threading.Thread(target= self._run, daemon= True,
+                                       name= 'profiler.sampler')
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        own= threading.get_ident()
+        
+        while not self._stop.wait(self.interval):
+            names= {x.ident: x.name for x in threading.enumerate()}
+            
+            for ident, frame in sys._current_frames().items():
+                if ident == own: continue
+
+                stack= []
+                while frame is not None:
+                    code= frame.f_code
+                    stack.append((code.co_filename, code.co_firstlineno,
+                                  code.co_name))
+                    frame= frame.f_back
+
+                stack.append(names.get(ident, str(ident)))
+                self.stacks[tuple(reversed(stack))]+= 1
+                self.samples+= 1
+
+    def top(self, count= 20):
+        '''
+        Lists the functions seen most often in the samples, across every 
+        thread.
+
+        Returns:
+            List of Tuples: (function, own, total), most total samples
+            first, where own counts the samples in which the function was
+            running and total those in which it was on the stack
+        '''
+
+        own= Counter()
+        total= Counter()
+        for stack, samples in self.stacks.items():
+            if len(stack) < 2: continue
+            
+            own[stack[-1]]+= samples
+            for function in set(stack[1:]): total[function]+= samples
+
+        return [(x, own[x], total[x]) for x in
+                sorted(total, key= lambda x: (-total[x], -own[x]))[:count]]
+
+    def print_stats(self, count= 20):
+        '''Prints the top functions, as percentages of the samples.'''
+
+        print('{} samples, every {:.1f} ms, from every thread'.format(
+            self.samples, self.interval * 1000))
+        print('{:>7} {:>7}  function'.format('own%', 'total%'))
+
+        for (filename, line, name), own, total in self.top(count):
+            print('{:7.1f} {:7.1f}  {} ({}:{})'.format(
+                100 * own / max(self.samples, 1),
+                100 * total / max(self.samples, 1),
+                name, os.path.basename(filename), line))
+
+    def dump_stats(self, path):
+        '''Saves the samples as collapsed stacks, one `a;b;c count` line per
+        stack with the thread name as the root, as read by flamegraph.pl 
+        and speedscope.'''
+
+        with open(path, 'w') as outfile:
+            for stack, samples in self.stacks.most_common():
+                outfile.write('{} {}\n'.format(';'.join([stack[0]] + [
+                    '{} ({}:{})'.format(name, os.path.basename(filename), line)
+                    for filename, line, name in stack[1:]]), samples))
+
+
+class threadProfiler():
+    '''Runs cProfile in the calling thread and in every thread started
+    while it is enabled, such as the workers of a ThreadPoolExecutor, and
+    merges their statistics. From Python 3.12, one cProfile.Profile already
+    sees every thread, so no others are started.'''
+
+    def __init__(self):
+        self.profiles= [cProfile.Profile()]
+        self._lock= threading.Lock()
+
+    def enable(self):
+        if sys.version_info < (3, 12): threading.setprofile(self._thread)
+        self.profiles[0].enable()
+
+    def disable(self):
+        self.profiles[0].disable()
+        threading.setprofile(None)
+
+    def _thread(self, frame, event, arg):
+        # Called once at the start of each new thread, to replace itself
+        # with a profiler of that thread
+        sys.setprofile(None)
+        profile= cProfile.Profile()
+        with self._lock: self.profiles.append(profile)
+        profile.enable()
+
+    def stats(self):
+        '''Returns the merged statistics of every thread as pstats.Stats.
+        Threads still running are included up to this point.'''
+        with self._lock: return pstats.Stats(*self.profiles)
+
+    def print_stats(self, count= 20):
+        print('{} thread(s) profiled'.format(len(self.profiles)))
+        self.stats().sort_stats('cumulative').print_stats(count)
+
+    def dump_stats(self, path):
+        self.stats().dump_stats(path)
+
+
+def memory_report(path, peak, snapshot, count= 20):
+    '''Saves the peak traced memory and the allocation sites holding the
+    most memory at the end of the run.'''
+
+    with open(path, 'w') as outfile:
+        outfile.write('Peak traced memory: {:.1f} MiB\n\n'.format(
+            peak / 2**20))
+        outfile.write('Largest allocation sites still held at the end:\n')
+
+        for x in snapshot.statistics('lineno')[:count]:
+            outfile.write('{:10.1f} KiB {:8} blocks  {}\n'.format(
+                x.size / 1024, x.count, x.traceback))
+
+
+@contextmanager
+def profile(args, name):
+    '''
+    Profiles the code run inside it, if the command line asked for it.
+    The report is written even if the code raises or exits.
+
+    Args:
+        args (argparse.Namespace): Parsed arguments from a parser with the
+            options of parse_args.add_profile_arguments. Nothing is 
+            profiled unless `args.profile` is set.
+        name (String): The name of the tool, used to name the files
+
+    Yields:
+        The threadProfiler or sampler, or None if not profiling
+    '''
+
+    if not getattr(args, 'profile', False):
+        yield None
+        return
+
+    mode= getattr(args, 'profile_mode', MODES[0])
+    count= getattr(args, 'profile_top', 20)
+
+    if mode == 'sample': profiler= sampler()
+    elif mode == 'cprofile': profiler= threadProfiler()
+    else: raise ValueError('Unknown profile mode [{}]'.format(mode))
+
+    # The profiled code may trace memory itself, as bench.bench_memory does
+    tracing= tracemalloc.is_tracing()
+    if not tracing: tracemalloc.start()
+    
+    if mode == 'sample': profiler.start()
+    else: profiler.enable()
+
+    try: yield profiler
+    finally:
+        if mode == 'sample': profiler.stop()
+        else: profiler.disable()
+
+        snapshot= None
+        if tracemalloc.is_tracing():
+            peak= tracemalloc.get_traced_memory()[1]
+            snapshot= tracemalloc.take_snapshot()
+            if not tracing: tracemalloc.stop()
+
+        os.makedirs(gvars.RUN_PATH, exist_ok= True)
+        base= os.path.join(gvars.RUN_PATH, '{}_{}'.format(
+            name, time.strftime(gvars.TIME_FORMAT_FILE)))
+
+        print('\nProfile of {} ({}):'.format(name, mode))
+        profiler.print_stats(count)
+        
+        path= base + ('.folded' if mode == 'sample' else '.prof')
+        profiler.dump_stats(path)
+        print('Profile saved to ' + path)
+
+        if snapshot is None:
+            print('Memory tracing was stopped during the run, so there is '
+                  'no memory report')
+        else:
+            memory_report(base + '.mem.txt', peak, snapshot, count)
+            print('Peak traced memory: {:.1f} MiB, report saved to {}'.format(
+                peak / 2**20, base + '.mem.txt'))
@@ -1,44 +1,14 @@
-import argparse, textwrap, cli
+import textwrap, cli, parse_args, profiler
 import sys
 
 
 def parse_cli():
-    parser = argparse.ArgumentParser(
-        prog= 'FireCheck - Send',
-        formatter_class= argparse.RawTextHelpFormatter,
-        description=textwrap.dedent(
+    parser= parse_args.make_parser()
+    parser.prog= 'FireCheck - Send'
+    parser.description= textwrap.dedent(
             '''\
             Sends a command to a firewall
-            '''))
-
-    parser.add_argument(
-        '-t',
-        action="store",
-        dest= 'host',
-        help= 'Network address of the firewall',
-        )
-    
-    parser.add_argument(
-        '-c',
-        action="store",
-        dest= 'context',
-        help= 'Change to the specified context',
-        default= None,
-        )
-
-    parser.add_argument(
-        '-u',
-        action="store",
-        dest= 'user',
-        help= 'Username',
-        )
-     
-    parser.add_argument(
-        '-p',
-        action="store",
-        dest= 'password',
-        help= 'Password',
-        )
+            ''')
     
     parser.add_argument(
         action="store",
@@ -53,24 +23,24 @@ def parse_cli():
 def main():
     args= parse_cli()
     
-    try:
-        connection= cli.connect_firewall(user= getattr(args, 'user', None),
-             password= getattr(args, 'password', None),
-             host= args.host,
-             context= args.context,
-             )
-    except IOError:
-        print('No connection could be established.')
-        sys.exit()
-
-    input('Ready to send: ' + args.command)
-    result= connection.send_command_expect(
-        args.command, delay_factor= 10)
-    
-    with open(args.command[:5] + '.txt', 'w') as outfile:
-        outfile.write(result) 
+    with profiler.profile(args, 'send_command'):
+        try:
+            connection= cli.connect_firewall(user= args.username,
+                 password= args.password,
+                 host= args.host,
+                 context= args.context,
+                 )
+        except IOError:
+            print('No connection could be established.')
+            sys.exit()
     
-    print(result)
+        input('Ready to send: ' + args.command)
+        result= cli.run_command(connection, args.command)
+        
+        with open(args.command[:5] + '.txt', 'w') as outfile:
+            outfile.write(result) 
+        
+        print(result)
 
 if __name__ == '__main__':
     main()
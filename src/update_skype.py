@@ -4,7 +4,7 @@ Created on Mar 1, 2017
 @author: Wyko
 '''
 
-import argparse, textwrap, re, cli, util, parse_args, objects
+import argparse, textwrap, re, cli, util, parse_args, objects, profiler
 import urllib.request as url
 
 from xml.etree import ElementTree as ET
@@ -109,19 +109,22 @@ def main():
     #                                      context= args.context)
     #===========================================================================
     
-    obj= objects.getObjects_fromFile()
-    
-    if (not isinstance(obj, dict)) or len(obj) != 2: 
-        print('Error getting objects from firewall')
-        return False
-    
-    # Get the top level object group for the O365 rule
-    top_obj= next((x for x in obj['groups'] if x.name == 
-          'Net-grp-Skype-for-Business-or-Lync-IPv4-Addresses'), None)
-    
-    for o in top_obj.members:
-        print(next((x for x in obj['objects'] if x.name == o['target']), None))
-        input()
+    with profiler.profile(args, 'update_skype'):
+        obj= objects.getObjects_fromFile()
+        
+        if (not isinstance(obj, dict)) or 'registry' not in obj: 
+            print('Error getting objects from firewall')
+            return False
+        
+        registry= obj['registry']
+        
+        # Get the top level object group for the O365 rule
+        top_obj= registry.groups.get(
+            'Net-grp-Skype-for-Business-or-Lync-IPv4-Addresses')
+        
+        for o in top_obj.members:
+            print(registry.objects.get(o['target']))
+            input()
     
 #===============================================================================
 #     # Generate the configuration    
@@ -1,6 +1,52 @@
 from contextlib import closing
+from concurrent.futures import ThreadPoolExecutor
 from netaddr import IPNetwork
-import socket, re, time
+import socket, re, time, threading, gvars
+
+# (address, port) -> time found open. Shared by every thread. Closed ports
+# are not cached, so a host that was briefly unreachable is probed again.
+_port_cache= {}
+_port_cache_lock= threading.Lock()
+
+# Patterns used by the text helpers, compiled once at import
+_NON_WORD= re.compile(r'\W+')
+_NON_IP_CHAR= re.compile(r'[^\d\.]+')
+
+_MAC= re.compile(r'''
+    (?:
+        [0-9A-F]{2,4}  # Match 2-4 Hex characters
+        [\:\-\.]       # Seperated by :, -, or .
+    ){2,7}             # match it between 2 and 7 times
+        [0-9A-F]{2,4}  # Followed by one last set of Hex
+    ''', re.I | re.X)
+
+_IP= re.compile(r'''
+    \b                        # Start at a word boundry
+    (?:
+        (?:
+            25[0-5]|          # Match 250-255
+            2[0-4][0-9]|      # Match 200-249
+            [01]?[0-9][0-9]?  # Match 0-199
+        )
+        (?:\.|\b)             # Followed by a . or a word boundry
+    ){4}                      # Repeat that four times
+    \b                        # End at a word boundry
+    ''', re.X)
+
+_IP_PREFIX= re.compile(r'''
+    (?:
+        (?:
+            25[0-5]|          # Match 250-255
+            2[0-4][0-9]|      # Match 200-249
+            [01]?[0-9][0-9]?  # Match 0-199
+        )
+        (?:\.|\b)             # Followed by a . or a word boundry
+    ){4}                      # Repeat that four times
+    ''', re.X)
+
+# Deletes every ASCII character except digits and periods
+_IP_CHARS= str.maketrans('', '', ''.join(
+    chr(x) for x in range(128) if not (chr(x).isdigit() or chr(x) == '.')))
 
 
 def getCreds():
@@ -8,7 +54,7 @@ def getCreds():
     Requests credentials via prompt otherwise.
     
     Returns:
-        List of Dicts: {username, password, type} If the username and password 
+        List of Dicts: {user, password, type} If the username and password 
             had to be requested, the list will only have one entry.
     """
     
@@ -21,24 +67,18 @@ def getCreds():
     import getpass
     username = input("Username: ")
     password = getpass.getpass("Password: ")
-    return [{'username': username, 'password': password, 'type': 'User Entered'}]  
+    return [{'user': username, 'password': password, 'type': 'User Entered'}]  
 
 
 def ucase_letters(raw_input):
-        return ''.join([x.upper() for x in raw_input if re.match(r'\w', x)])
+        '''Returns the word characters of a string, in upper case.'''
+        return _NON_WORD.sub('', raw_input).upper()
 
 
 def contains_mac_address(mac):
     '''Simple boolean operator to determine if a string contains a mac anywhere
     within it.'''
-    return bool(re.search(r'''
-        (?:
-            [0-9A-F]{2,4}  # Match 2-4 Hex characters
-            [\:\-\.]       # Seperated by :, -, or .
-        ){2,7}             # match it between 2 and 7 times
-            [0-9A-F]{2,4}  # Followed by one last set of Hex
-        ''',
-        mac, re.I | re.X))
+    return _MAC.search(mac) is not None
 
 
 def network_ip(ip, subnet):
@@ -60,38 +100,93 @@ def network_ip(ip, subnet):
 def parse_ip(raw_input):
     """Returns a list of strings containing each IP address 
     matched in the input string."""
-    return re.findall(r'''
-        \b                        # Start at a word boundry
-        (?:
-            (?:
-                25[0-5]|          # Match 250-255
-                2[0-4][0-9]|      # Match 200-249
-                [01]?[0-9][0-9]?  # Match 0-199
-            )
-            (?:\.|\b)             # Followed by a . or a word boundry
-        ){4}                      # Repeat that four times
-        \b                        # End at a word boundry
-        ''', raw_input, re.X)
+    return _IP.findall(raw_input)
 
 
 def is_ip(raw_input):
-    '''Returns true if the given string is an IPv4 address'''
+    '''Returns true if the given string starts with an IPv4 address, 
+    such as `10.0.0.1` or `10.0.0.1 / 24`. Use pack_ip to accept only a 
+    plain dotted quad.'''
     if not isinstance(raw_input, str):
         raise TypeError('[{}] is not a string'.format(
             raw_input))
     
-    match= re.match(r'''
-        (?:
-            (?:
-                25[0-5]|          # Match 250-255
-                2[0-4][0-9]|      # Match 200-249
-                [01]?[0-9][0-9]?  # Match 0-199
-            )
-            (?:\.|\b)             # Followed by a . or a word boundry
-        ){4}                      # Repeat that four times
-        ''', raw_input, re.X)
+    # Every match starts with a digit, so most names fail without a regex
+    return raw_input[:1].isdigit() and _IP_PREFIX.match(raw_input) is not None
+
+
+def pack_ip(raw_input):
+    '''Packs a dotted quad IPv4 address into a 32 bit integer without 
+    using a regex. Returns None if the string is not a dotted quad.'''
+    
+    parts= raw_input.split('.')
+    if len(parts) != 4 or not raw_input.isascii(): return None
+    
+    for x in parts:
+        if not (0 < len(x) <= 3 and x.isdigit()): return None
+    
+    # bytes() rejects any octet over 255
+    try: return int.from_bytes(bytes(map(int, parts)), 'big')
+    except ValueError: return None
+
+
+def ip_to_int(raw_input):
+    '''Packs a dotted quad IPv4 address into a 32 bit integer.
+    
+    Raises:
+        ValueError: If the string is not a dotted quad IPv4 address
+    '''
+    
+    packed= pack_ip(raw_input)
+    if packed is None:
+        raise ValueError('[{}] is not an IPv4 address'.format(raw_input))
+    
+    return packed
+
+
+def int_to_ip(value):
+    '''Unpacks a 32 bit integer into a dotted quad IPv4 address.'''
+    return '{}.{}.{}.{}'.format(
+        value >> 24, value >> 16 & 255, value >> 8 & 255, value & 255)
+
+
+def merge_intervals(intervals):
+    '''Sorts a list of (start, end) address intervals and merges the ones
+    that overlap or touch, so that every address is covered exactly once.
+    
+    Returns:
+        List of Tuples: (start, end), in ascending order
+    '''
+    
+    merged= []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1] + 1:
+            if end > merged[-1][1]: merged[-1]= (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    
+    return merged
+
+
+def interval_prefixes(start, end):
+    '''Splits an interval of packed IPv4 addresses into the fewest CIDR 
+    blocks that cover exactly the same addresses.
+    
+    Returns:
+        List of Tuples: (network, prefix length), in ascending order
+    '''
+    
+    blocks= []
+    while start <= end:
+        # The largest block aligned on start, shrunk until it fits
+        size= start & -start or 1 << 32
+        while start + size - 1 > end: size>>= 1
+        
+        blocks.append((start, 33 - size.bit_length()))
+        start+= size
     
-    return bool(match)
+    return blocks
+
 
 def netmask_to_cidr(netmask):
     return sum([bin(int(x)).count("1") for x in netmask.split(".")])
@@ -123,7 +218,10 @@ def clean_ip(ip):
     '''Removes all non-digit or period characters from
     the source string'''
     
-    return ''.join([x for x in ip if re.match(r'[\d\.]', x)])
+    if ip.isascii(): return ip.translate(_IP_CHARS)
+    
+    # Other scripts have digits of their own
+    return _NON_IP_CHAR.sub('', ip)
         
 
 def timeit(method):
@@ -170,3 +268,91 @@ def port_is_open(port, address, timeout=5):
             else:
                     return False 
     return False
+
+
+def probe_ports(address, ports, timeout=5, ttl=None):
+    """Checks several ports on a host at the same time, so an unreachable 
+    host costs one timeout rather than one per port. Open ports are cached, 
+    and cached results younger than `ttl` are used without probing again.
+    Closed ports are always probed again.
+    
+    Args:
+        address (string): The IP address of the host to check.
+        ports (list of int): The numbered TCP ports to check
+        
+    Optional Args:
+        timeout (int): The number of seconds to wait before timing out. 
+            Defaults to 5 seconds.
+        ttl (int): The number of seconds a cached result stays valid.
+            Defaults to gvars.PORT_CACHE_TTL. Zero disables the cache.
+    
+    Returns: 
+        dict: Port -> True if the port is open, False if closed.
+    """
+    
+    return sweep([address], ports, timeout= timeout, ttl= ttl)[address]
+
+
+def sweep(addresses, ports=(22, 23), timeout=5, ttl=None, workers=64):
+    """Checks the same ports on many hosts at once, using a pool of 
+    threads. Shares its cache with probe_ports.
+    
+    Args:
+        addresses (list of string): The IP addresses of the hosts to check.
+        
+    Optional Args:
+        ports (list of int): The numbered TCP ports to check. Defaults to
+            22 and 23.
+        timeout (int): The number of seconds to wait before timing out. 
+            Defaults to 5 seconds.
+        ttl (int): The number of seconds a cached result stays valid.
+            Defaults to gvars.PORT_CACHE_TTL. Zero disables the cache.
+        workers (int): The most ports to check at once. Defaults to 64.
+    
+    Returns: 
+        dict: Address -> {Port -> True if the port is open, False if closed}
+    """
+    
+    if ttl is None: ttl= gvars.PORT_CACHE_TTL
+    now= time.monotonic()
+    
+    results= {address: {} for address in addresses}
+    pending= []
+    
+    # Use any results that are still fresh
+    with _port_cache_lock:
+        for address in results:
+            for port in ports:
+                cached= _port_cache.get((address, port))
+                if cached is not None and now - cached < ttl:
+                    results[address][port]= True
+                else:
+                    pending.append((address, port))
+    
+    if not pending: return results
+    
+    with ThreadPoolExecutor(max_workers= min(workers, len(pending))) as pool:
+        checked= pool.map(
+            lambda x: port_is_open(x[1], x[0], timeout= timeout), pending)
+        
+        for (address, port), is_open in zip(pending, checked):
+            results[address][port]= is_open
+            if not is_open: continue
+            
+            with _port_cache_lock:
+                _port_cache[(address, port)]= time.monotonic()
+    
+    return results
+
+
+def clear_port_cache(address=None):
+    """Forgets the cached port results for one host, or for every host if 
+    no address is given."""
+    
+    with _port_cache_lock:
+        if address is None: 
+            _port_cache.clear()
+            return
+        
+        for key in [x for x in _port_cache if x[0] == address]:
+            del _port_cache[key]